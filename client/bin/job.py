@@ -936,7 +936,7 @@ class base_client_job(base_job.base_job):
             new_log_path = old_log_path + (".%d" % i)
             if os.path.exists(new_log_path):
                 new_log = open(new_log_path)
-                old_log.write(new_log.read())
+                shutil.copyfileobj(new_log, old_log)
                 new_log.close()
                 old_log.flush()
                 os.remove(new_log_path)
@@ -1174,9 +1174,12 @@ class base_client_job(base_job.base_job):
                 self.record('END FAIL', subdir, testname)
 
         # Iterate through the steps.  If we reboot, we'll simply
-        # continue iterating on the next step.
-        while len(self._state.get('client', 'steps')) > 0:
+        # continue iterating on the next step. Every state access is a full
+        # read and rewrite of the backing file, so only fetch the steps once.
+        while True:
             steps = self._state.get('client', 'steps')
+            if not steps:
+                break
             (ancestry, fn_name, args, dargs) = steps.pop(0)
             self._state.set('client', 'steps', steps)
 
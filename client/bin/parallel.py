@@ -2,7 +2,8 @@
 
 __author__ = """Copyright Andy Whitcroft 2006"""
 
-import sys, logging, os, pickle, traceback, gc, time
+import sys, logging, os, traceback, gc, time
+import cPickle as pickle
 from autotest_lib.client.common_lib import error, utils
 
 def fork_start(tmp, l):
@@ -35,7 +36,7 @@ def fork_start(tmp, l):
                 if not os.path.exists(output_dir):
                     os.makedirs(output_dir)
                 ename = os.path.join(output_dir, "error-%d" % os.getpid())
-                pickle.dump(detail, open(ename, "w"))
+                pickle.dump(detail, open(ename, "wb"), pickle.HIGHEST_PROTOCOL)
 
                 sys.stdout.flush()
                 sys.stderr.flush()
@@ -57,7 +58,7 @@ def _check_for_subprocess_exception(temp_dir, pid):
     ename = temp_dir + "/debug/error-%d" % pid
     if os.path.exists(ename):
         try:
-            e = pickle.load(file(ename, 'r'))
+            e = pickle.load(file(ename, 'rb'))
         except ImportError:
             with open(ename, 'r') as fp:
                 file_text = fp.read()
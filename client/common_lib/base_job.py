@@ -223,7 +223,7 @@ class job_state(object):
         if os.path.getsize(file_path) == 0:
             on_disk_state = {}
         else:
-            on_disk_state = pickle.load(open(file_path))
+            on_disk_state = pickle.load(open(file_path, 'rb'))
 
         if merge:
             # merge the on-disk state with the in-memory state
@@ -260,7 +260,7 @@ class job_state(object):
         @warning: This method is intentionally concurrency-unsafe. It makes no
             attempt to control concurrent access to the file at file_path.
         """
-        outfile = open(file_path, 'w')
+        outfile = open(file_path, 'wb')
         try:
             pickle.dump(self._state, outfile, self.PICKLE_PROTOCOL)
         finally:
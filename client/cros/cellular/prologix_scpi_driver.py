@@ -5,6 +5,7 @@
 
 import cellular_system_error
 import cellular_logging
+import logging
 import os
 import select
 import socket
@@ -162,12 +163,12 @@ class PrologixScpiDriver:
         """Send a GPIB command and return the response."""
         #self.SetAuto(1) #maybe useful?
 
-        s = list(self.scpi_logger.findCaller())
-        s[0] = os.path.basename(s[0])
-
-        s = list(self.scpi_logger.findCaller())
-        s[0] = os.path.basename(s[0])
-        self.scpi_logger.debug('caller :' + str(s) + command)
+        # findCaller() walks the stack, so only pay for it when the message
+        # is actually going to be logged.
+        if self.scpi_logger.isEnabledFor(logging.DEBUG):
+            s = list(self.scpi_logger.findCaller())
+            s[0] = os.path.basename(s[0])
+            self.scpi_logger.debug('caller :%s%s', s, command)
 
         self.Send(command)
         if not self.auto:
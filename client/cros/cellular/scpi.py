@@ -3,11 +3,60 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
+import re
+
 import cellular_logging
 import cellular_system_error
 
 log = cellular_logging.SetupCellularLogging('scpi_driver')
 
+# Longest compound command that SendStanza will build.  Each command sent is a
+# full bus round-trip, so stanzas are packed into as few commands as possible.
+MAX_COMPOUND_COMMAND_LENGTH = 1024
+
+# SYSTem:ERRor? response marking the end of the error queue.
+_NO_ERROR_RE = re.compile(r'\+0,"No error"')
+
+# SYSTem:ERRor? responses that are not worth failing over:
+#  -420: the GPIB bridge asked for a response when the device didn't have
+#    one to give.
+#    TODO(rochberg): This is a layering violation; we should really only
+#    accept -420 if the underlying driver is in a mode that is known to
+#    cause this
+#  +292: known to occur when we do a switch from GPRS to WCDMA.
+_BENIGN_ERROR_RE = re.compile(r'-420.*Query UNTERMINATED|'
+                              r'\+292.*Data arrived on unknown SAPI')
+
+
+def _CompoundCommands(commands, max_length=MAX_COMPOUND_COMMAND_LENGTH):
+    """Joins SCPI commands into ';' separated compound commands.
+
+    SCPI resolves each command of a compound command relative to the header
+    path of the one before it, so every command after the first is rooted
+    with a leading ':' unless it is a common (*XXX) command.
+
+    Arguments:
+      commands: list of SCPI commands
+      max_length: longest compound command to build.  A single command
+        longer than this is passed through on its own.
+
+    Yields:
+      compound commands, in order
+    """
+    compound = ''
+    for command in commands:
+        rooted = command
+        if not command.startswith((':', '*')):
+            rooted = ':' + command
+        if compound and len(compound) + 1 + len(rooted) <= max_length:
+            compound += ';' + rooted
+        else:
+            if compound:
+                yield compound
+            compound = command
+    if compound:
+        yield compound
+
 
 class _ErrorCheckerContext(object):
     """Reference-count our error-checking state and only check for
@@ -29,8 +78,8 @@ class _ErrorCheckerContext(object):
         self.raise_on_error = True
 
     def __enter__(self):
-        log.debug('ErrorCheckerContext Depth: %s' % self.depth)
-        if self.depth == 0 or self.always_check:
+        log.debug('ErrorCheckerContext Depth: %s', self.depth)
+        if (self.depth == 0 or self.always_check) and self.scpi._dirty:
             errors = self.scpi._WaitAndFetchErrors(
                 raise_on_error=False)  # Never raise when clearing old errors
         self.depth += 1
@@ -38,7 +87,7 @@ class _ErrorCheckerContext(object):
 
     def __exit__(self, type, value, traceback):
         self.depth -= 1
-        if self.depth <= 0 or self.always_check:
+        if (self.depth <= 0 or self.always_check) and self.scpi._dirty:
             self.scpi._WaitAndFetchErrors()
         return
 
@@ -56,20 +105,27 @@ class Scpi(object):
         self.driver = driver
         self.opc_on_stanza = opc_on_stanza
         self.checker_context = _ErrorCheckerContext(self)
+        # True when commands may have been issued since the last error check.
+        # We know nothing about the device's error queue until the first
+        # check, so start out dirty.
+        self._dirty = True
 
     def Query(self, command):
         """Send the SCPI command and return the response."""
+        self._dirty = True
         response = self.driver.Query(command)
         return response
 
     def Send(self, command):
         """Send the SCPI command."""
+        self._dirty = True
         self.driver.Send(command)
 
     def Reset(self):
         """Tell the device to reset with *RST."""
         # Some devices (like the prologix) require special handling for
         # reset.
+        self._dirty = True
         self.driver.Reset()
 
     def Close(self):
@@ -81,25 +137,12 @@ class Scpi(object):
         errors = []
         while True:
             error = self.Query('SYSTem:ERRor?')
-            if '+0,"No error"' in error:
+            if _NO_ERROR_RE.search(error):
                 # We've reached the end of the error stack
                 break
 
-            if '-420' in error and 'Query UNTERMINATED' in error:
-                # This is benign; the GPIB bridge asked for a response when
-                # the device didn't have one to give.
-
-                # TODO(rochberg): This is a layering violation; we should
-                # really only accept -420 if the underlying driver is in a
-                # mode that is known to cause this
-                continue
-
-            if '+292' in error and 'Data arrived on unknown SAPI' in error:
-                # This may be benign; It is known to occur when we do a switch
-                # from GPRS to WCDMA
-                continue
-
-            errors.append(error)
+            if not _BENIGN_ERROR_RE.search(error):
+                errors.append(error)
 
         self.Send('*CLS')           # Clear status
         errors.reverse()
@@ -109,6 +152,7 @@ class Scpi(object):
         """Waits for command completion, returns errors."""
         self.Query('*OPC?')      # Wait for operation complete
         errors = self.RetrieveErrors()
+        self._dirty = False
         if errors and raise_on_error:
             raise cellular_system_error.BadScpiCommand('\n'.join(errors))
         return errors
@@ -136,11 +180,13 @@ class Scpi(object):
     def SendStanza(self, commands):
         """
         Sends a list of commands and verifies that they complete correctly.
+
+        The commands are coalesced into as few compound commands as
+        possible, and with opc_on_stanza set we wait for completion once
+        after the whole stanza rather than after every command.
         """
         with self.checker_context:
-            for c in commands:
-                if self.opc_on_stanza:
-                    self.Send(c)
-                    self.Query('*OPC?')
-                else:
-                    self.Send(c)
+            for c in _CompoundCommands(commands):
+                self.Send(c)
+            if commands and self.opc_on_stanza:
+                self.Query('*OPC?')
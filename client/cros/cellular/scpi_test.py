@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# Copyright (c) 2013 The Chromium OS Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+# pylint: disable-msg=C0111
+
+import unittest
+import scpi
+
+
+class FakeDriver(object):
+    """Records every command and answers queries from a canned script."""
+
+    def __init__(self, errors=None):
+        self.sent = []
+        self.errors = list(errors or [])
+
+    def Send(self, command):
+        self.sent.append(command)
+
+    def Reset(self):
+        self.sent.append('*RST')
+
+    def Query(self, command):
+        self.sent.append(command)
+        if command == 'SYSTem:ERRor?':
+            if self.errors:
+                return self.errors.pop(0)
+            return '+0,"No error"'
+        return '1'
+
+
+class ScpiTest(unittest.TestCase):
+
+    def test_compound_commands(self):
+        commands = ['CALL:MCCode 001', 'CALL:MNCode 01', '*WAI', ':SYST:X 1']
+        self.assertEqual(
+            list(scpi._CompoundCommands(commands)),
+            ['CALL:MCCode 001;:CALL:MNCode 01;*WAI;:SYST:X 1'])
+
+    def test_compound_commands_splits_long_stanzas(self):
+        commands = ['A' * 6, 'B' * 6, 'C' * 6]
+        self.assertEqual(
+            list(scpi._CompoundCommands(commands, max_length=14)),
+            ['AAAAAA;:BBBBBB', 'CCCCCC'])
+
+    def test_send_stanza_with_opc(self):
+        driver = FakeDriver()
+        connection = scpi.Scpi(driver, opc_on_stanza=True)
+        connection.checker_context.always_check = False
+        connection.SendStanza(['CALL:MCCode 001', 'CALL:MNCode 01'])
+        stanza = driver.sent.index('CALL:MCCode 001;:CALL:MNCode 01')
+        self.assertEqual(driver.sent[stanza + 1], '*OPC?')
+        self.assertEqual(driver.sent.count('*OPC?'), 3)
+
+    def test_clean_contexts_skip_error_checks(self):
+        driver = FakeDriver()
+        connection = scpi.Scpi(driver)
+        connection.checker_context.always_check = False
+        connection.SendStanza(['CALL:MCCode 001'])
+        del driver.sent[:]
+        with connection.checker_context:
+            with connection.checker_context:
+                pass
+        self.assertEqual(driver.sent, [])
+
+    def test_reset_marks_dirty(self):
+        driver = FakeDriver()
+        connection = scpi.Scpi(driver)
+        connection.checker_context.always_check = False
+        connection.SendStanza(['CALL:MCCode 001'])
+        connection.Reset()
+        driver.errors.append('-100,"Command error"')
+        del driver.sent[:]
+        # The error left by the reset is cleared on entry, not raised on exit.
+        connection.SendStanza(['CALL:MNCode 01'])
+        self.assertEqual(driver.sent[:2], ['*OPC?', 'SYSTem:ERRor?'])
+
+    def test_retrieve_errors(self):
+        driver = FakeDriver(errors=[
+            '-100,"Command error"',
+            '-420,"Query UNTERMINATED"',
+            '+292,"Data arrived on unknown SAPI"',
+            '-200,"Execution error"'])
+        connection = scpi.Scpi(driver)
+        self.assertEqual(connection.RetrieveErrors(),
+                         ['-200,"Execution error"', '-100,"Command error"'])
+
+
+if __name__ == '__main__':
+    unittest.main()
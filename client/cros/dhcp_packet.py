@@ -34,6 +34,24 @@ import socket
 import struct
 
 
+# Source of transaction ids for packets we originate.
+_transaction_id_random = random.Random()
+
+# Packets are built from a small set of addresses, and socket.inet_aton() is
+# pure, so keep the packed form of recently seen addresses around.
+_PACKED_ADDRESS_CACHE = {}
+_PACKED_ADDRESS_CACHE_SIZE = 256
+
+def _pack_address(address):
+    packed = _PACKED_ADDRESS_CACHE.get(address)
+    if packed is None:
+        packed = socket.inet_aton(address)
+        if len(_PACKED_ADDRESS_CACHE) >= _PACKED_ADDRESS_CACHE_SIZE:
+            _PACKED_ADDRESS_CACHE.clear()
+        _PACKED_ADDRESS_CACHE[address] = packed
+    return packed
+
+
 def CreatePacketPieceClass(super_class, field_format):
     class PacketPiece(super_class):
         @staticmethod
@@ -72,7 +90,7 @@ IntOption = CreatePacketPieceClass(Option, "!I")
 class IpAddressOption(Option):
     @staticmethod
     def pack(value):
-        return socket.inet_aton(value)
+        return _pack_address(value)
 
     @staticmethod
     def unpack(byte_string):
@@ -82,12 +100,12 @@ class IpAddressOption(Option):
 class IpListOption(Option):
     @staticmethod
     def pack(value):
-        return "".join([socket.inet_aton(addr) for addr in value])
+        return "".join(map(_pack_address, value))
 
     @staticmethod
     def unpack(byte_string):
         return [socket.inet_ntoa(byte_string[idx:idx+4])
-                for idx in range(0, len(byte_string), 4)]
+                for idx in xrange(0, len(byte_string), 4)]
 
 
 class RawOption(Option):
@@ -103,11 +121,11 @@ class RawOption(Option):
 class ByteListOption(Option):
     @staticmethod
     def pack(value):
-        return "".join(chr(v) for v in value)
+        return "".join(map(chr, value))
 
     @staticmethod
     def unpack(byte_string):
-        return [ord(c) for c in byte_string]
+        return list(bytearray(byte_string))
 
 
 class ClasslessStaticRoutesOption(Option):
@@ -277,7 +295,7 @@ BootFileField = CreatePacketPieceClass(Field, "!128s")
 class IpAddressField(Field):
     @staticmethod
     def pack(value):
-        return socket.inet_aton(value)
+        return _pack_address(value)
 
     @staticmethod
     def unpack(byte_string):
@@ -357,7 +375,7 @@ OPTION_WEB_PROXY_AUTO_DISCOVERY = RawOption("wpad", 252)
 OPTION_PAD = 0
 OPTION_END = 255
 
-DHCP_COMMON_FIELDS = [
+DHCP_COMMON_FIELDS = (
         FIELD_OP,
         FIELD_HWTYPE,
         FIELD_HWADDR_LEN,
@@ -370,17 +388,17 @@ DHCP_COMMON_FIELDS = [
         FIELD_SERVER_IP,
         FIELD_GATEWAY_IP,
         FIELD_CLIENT_HWADDR,
-        ]
+        )
 
-DHCP_REQUIRED_FIELDS = DHCP_COMMON_FIELDS + [
+DHCP_REQUIRED_FIELDS = DHCP_COMMON_FIELDS + (
         FIELD_MAGIC_COOKIE,
-        ]
+        )
 
-DHCP_ALL_FIELDS = DHCP_COMMON_FIELDS + [
+DHCP_ALL_FIELDS = DHCP_COMMON_FIELDS + (
         FIELD_LEGACY_SERVER_NAME,
         FIELD_LEGACY_BOOT_FILE,
         FIELD_MAGIC_COOKIE,
-        ]
+        )
 
 # The op field in an ipv4 packet is either 1 or 2 depending on
 # whether the packet is from a server or from a client.
@@ -394,6 +412,20 @@ FIELD_VALUE_MAGIC_COOKIE = 0x63825363
 
 OPTIONS_START_OFFSET = 240
 
+# The fixed size portion of every packet, laid out in the same order as
+# DHCP_ALL_FIELDS.  Packing and unpacking this in a single call is much cheaper
+# than handling each field individually.
+DHCP_HEADER_STRUCT = struct.Struct("!BBBBIHH4s4s4s4s16s64s128sI")
+
+# Every option other than OPTION_PAD and OPTION_END starts with its number and
+# the length of its data.
+DHCP_OPTION_HEADER_STRUCT = struct.Struct("!BB")
+
+# DHCP_ALL_FIELDS in DHCP_HEADER_STRUCT order, each paired with whether its
+# unpacked value is a packed IP address that still needs decoding.
+_HEADER_FIELDS = tuple((field, isinstance(field, IpAddressField))
+                       for field in DHCP_ALL_FIELDS)
+
 MessageType = collections.namedtuple('MessageType', 'name option_value')
 # From RFC2132, the valid DHCP message types are:
 MESSAGE_TYPE_UNKNOWN = MessageType('UNKNOWN', 0)
@@ -443,7 +475,7 @@ OPTION_VALUE_PARAMETER_REQUEST_LIST_DEFAULT = [
 #
 # size < 0 indicates that this is variable length field of at least
 # abs(length) bytes in size.
-DHCP_PACKET_OPTIONS = [
+DHCP_PACKET_OPTIONS = (
         OPTION_TIME_OFFSET,
         OPTION_ROUTERS,
         OPTION_SUBNET_MASK,
@@ -482,13 +514,38 @@ DHCP_PACKET_OPTIONS = [
         OPTION_DNS_DOMAIN_SEARCH_LIST,
         OPTION_CLASSLESS_STATIC_ROUTES,
         OPTION_WEB_PROXY_AUTO_DISCOVERY,
-        ]
+        )
+
+# Field values shared by every packet built by the DhcpPacket factories.  The
+# factories copy one of these and then fill in the per-packet fields.
+_CLIENT_REQUEST_FIELDS = {
+        FIELD_OP: FIELD_VALUE_OP_CLIENT_REQUEST,
+        FIELD_HWTYPE: FIELD_VALUE_HWTYPE_10MB_ETH,
+        FIELD_HWADDR_LEN: FIELD_VALUE_HWADDR_LEN_10MB_ETH,
+        # This has something to do with relay agents
+        FIELD_RELAY_HOPS: 0,
+        FIELD_TIME_SINCE_START: 0,
+        FIELD_FLAGS: 0,
+        FIELD_CLIENT_IP: IPV4_NULL_ADDRESS,
+        FIELD_YOUR_IP: IPV4_NULL_ADDRESS,
+        FIELD_SERVER_IP: IPV4_NULL_ADDRESS,
+        FIELD_GATEWAY_IP: IPV4_NULL_ADDRESS,
+        FIELD_MAGIC_COOKIE: FIELD_VALUE_MAGIC_COOKIE,
+        }
+
+_SERVER_RESPONSE_FIELDS = dict(_CLIENT_REQUEST_FIELDS)
+_SERVER_RESPONSE_FIELDS[FIELD_OP] = FIELD_VALUE_OP_SERVER_RESPONSE
+
+# The position of each option in DHCP_PACKET_OPTIONS, which is the order they
+# are serialized in.
+_OPTION_ORDER = dict((option, index)
+                     for index, option in enumerate(DHCP_PACKET_OPTIONS))
+
+DHCP_PACKET_OPTIONS_BY_NUMBER = dict((option.number, option)
+                                    for option in DHCP_PACKET_OPTIONS)
 
 def get_dhcp_option_by_number(number):
-    for option in DHCP_PACKET_OPTIONS:
-        if option.number == number:
-            return option
-    return None
+    return DHCP_PACKET_OPTIONS_BY_NUMBER.get(number)
 
 class DhcpPacket(object):
     @staticmethod
@@ -503,25 +560,17 @@ class DhcpPacket(object):
         this packet will probably not contain all of that information.
         """
         # MAC addresses are actually only 6 bytes long, however, for whatever
-        # reason, DHCP allocated 12 bytes to this field.  Ease the burden on
-        # developers and hide this detail.
-        while len(hwmac_addr) < 12:
-            hwmac_addr += chr(OPTION_PAD)
+        # reason, DHCP allocated 16 bytes to this field.  Ease the burden on
+        # developers and hide this detail.  This also matches the value that
+        # parsing a packet off the wire gives back.
+        hwmac_addr = hwmac_addr.ljust(FIELD_CLIENT_HWADDR.size,
+                                      chr(OPTION_PAD))
 
         packet = DhcpPacket()
-        packet.set_field(FIELD_OP, FIELD_VALUE_OP_CLIENT_REQUEST)
-        packet.set_field(FIELD_HWTYPE, FIELD_VALUE_HWTYPE_10MB_ETH)
-        packet.set_field(FIELD_HWADDR_LEN, FIELD_VALUE_HWADDR_LEN_10MB_ETH)
-        packet.set_field(FIELD_RELAY_HOPS, 0)
-        packet.set_field(FIELD_TRANSACTION_ID, random.getrandbits(32))
-        packet.set_field(FIELD_TIME_SINCE_START, 0)
-        packet.set_field(FIELD_FLAGS, 0)
-        packet.set_field(FIELD_CLIENT_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_YOUR_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_SERVER_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_GATEWAY_IP, IPV4_NULL_ADDRESS)
+        packet._fields = _CLIENT_REQUEST_FIELDS.copy()
+        packet.set_field(FIELD_TRANSACTION_ID,
+                         _transaction_id_random.getrandbits(32))
         packet.set_field(FIELD_CLIENT_HWADDR, hwmac_addr)
-        packet.set_field(FIELD_MAGIC_COOKIE, FIELD_VALUE_MAGIC_COOKIE)
         packet.set_option(OPTION_DHCP_MESSAGE_TYPE,
                           MESSAGE_TYPE_DISCOVERY.option_value)
         return packet
@@ -536,20 +585,11 @@ class DhcpPacket(object):
         particular offer.
         """
         packet = DhcpPacket()
-        packet.set_field(FIELD_OP, FIELD_VALUE_OP_SERVER_RESPONSE)
-        packet.set_field(FIELD_HWTYPE, FIELD_VALUE_HWTYPE_10MB_ETH)
-        packet.set_field(FIELD_HWADDR_LEN, FIELD_VALUE_HWADDR_LEN_10MB_ETH)
-        # This has something to do with relay agents
-        packet.set_field(FIELD_RELAY_HOPS, 0)
+        packet._fields = _SERVER_RESPONSE_FIELDS.copy()
         packet.set_field(FIELD_TRANSACTION_ID, transaction_id)
-        packet.set_field(FIELD_TIME_SINCE_START, 0)
-        packet.set_field(FIELD_FLAGS, 0)
-        packet.set_field(FIELD_CLIENT_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_YOUR_IP, offer_ip)
         packet.set_field(FIELD_SERVER_IP, server_ip)
-        packet.set_field(FIELD_GATEWAY_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_CLIENT_HWADDR, hwmac_addr)
-        packet.set_field(FIELD_MAGIC_COOKIE, FIELD_VALUE_MAGIC_COOKIE)
         packet.set_option(OPTION_DHCP_MESSAGE_TYPE,
                           MESSAGE_TYPE_OFFER.option_value)
         return packet
@@ -558,20 +598,9 @@ class DhcpPacket(object):
     def create_request_packet(transaction_id,
                               hwmac_addr):
         packet = DhcpPacket()
-        packet.set_field(FIELD_OP, FIELD_VALUE_OP_CLIENT_REQUEST)
-        packet.set_field(FIELD_HWTYPE, FIELD_VALUE_HWTYPE_10MB_ETH)
-        packet.set_field(FIELD_HWADDR_LEN, FIELD_VALUE_HWADDR_LEN_10MB_ETH)
-        # This has something to do with relay agents
-        packet.set_field(FIELD_RELAY_HOPS, 0)
+        packet._fields = _CLIENT_REQUEST_FIELDS.copy()
         packet.set_field(FIELD_TRANSACTION_ID, transaction_id)
-        packet.set_field(FIELD_TIME_SINCE_START, 0)
-        packet.set_field(FIELD_FLAGS, 0)
-        packet.set_field(FIELD_CLIENT_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_YOUR_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_SERVER_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_GATEWAY_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_CLIENT_HWADDR, hwmac_addr)
-        packet.set_field(FIELD_MAGIC_COOKIE, FIELD_VALUE_MAGIC_COOKIE)
         packet.set_option(OPTION_DHCP_MESSAGE_TYPE,
                           MESSAGE_TYPE_REQUEST.option_value)
         return packet
@@ -582,20 +611,11 @@ class DhcpPacket(object):
                                       granted_ip,
                                       server_ip):
         packet = DhcpPacket()
-        packet.set_field(FIELD_OP, FIELD_VALUE_OP_SERVER_RESPONSE)
-        packet.set_field(FIELD_HWTYPE, FIELD_VALUE_HWTYPE_10MB_ETH)
-        packet.set_field(FIELD_HWADDR_LEN, FIELD_VALUE_HWADDR_LEN_10MB_ETH)
-        # This has something to do with relay agents
-        packet.set_field(FIELD_RELAY_HOPS, 0)
+        packet._fields = _SERVER_RESPONSE_FIELDS.copy()
         packet.set_field(FIELD_TRANSACTION_ID, transaction_id)
-        packet.set_field(FIELD_TIME_SINCE_START, 0)
-        packet.set_field(FIELD_FLAGS, 0)
-        packet.set_field(FIELD_CLIENT_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_YOUR_IP, granted_ip)
         packet.set_field(FIELD_SERVER_IP, server_ip)
-        packet.set_field(FIELD_GATEWAY_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_CLIENT_HWADDR, hwmac_addr)
-        packet.set_field(FIELD_MAGIC_COOKIE, FIELD_VALUE_MAGIC_COOKIE)
         packet.set_option(OPTION_DHCP_MESSAGE_TYPE,
                           MESSAGE_TYPE_ACK.option_value)
         return packet
@@ -609,20 +629,9 @@ class DhcpPacket(object):
         @param hwmac_addr: The client's MAC address.
         """
         packet = DhcpPacket()
-        packet.set_field(FIELD_OP, FIELD_VALUE_OP_SERVER_RESPONSE)
-        packet.set_field(FIELD_HWTYPE, FIELD_VALUE_HWTYPE_10MB_ETH)
-        packet.set_field(FIELD_HWADDR_LEN, FIELD_VALUE_HWADDR_LEN_10MB_ETH)
-        # This has something to do with relay agents
-        packet.set_field(FIELD_RELAY_HOPS, 0)
+        packet._fields = _SERVER_RESPONSE_FIELDS.copy()
         packet.set_field(FIELD_TRANSACTION_ID, transaction_id)
-        packet.set_field(FIELD_TIME_SINCE_START, 0)
-        packet.set_field(FIELD_FLAGS, 0)
-        packet.set_field(FIELD_CLIENT_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_YOUR_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_SERVER_IP, IPV4_NULL_ADDRESS)
-        packet.set_field(FIELD_GATEWAY_IP, IPV4_NULL_ADDRESS)
         packet.set_field(FIELD_CLIENT_HWADDR, hwmac_addr)
-        packet.set_field(FIELD_MAGIC_COOKIE, FIELD_VALUE_MAGIC_COOKIE)
         packet.set_option(OPTION_DHCP_MESSAGE_TYPE,
                           MESSAGE_TYPE_NAK.option_value)
         return packet
@@ -647,28 +656,39 @@ class DhcpPacket(object):
         """
         super(DhcpPacket, self).__init__()
         self._options = {}
+        # Options parsed from |byte_str| that nobody has asked for yet, still
+        # in their on the wire form.  They are decoded into |_options| on
+        # first use.
+        self._raw_options = {}
         self._fields = {}
         if byte_str is None:
             return
         if len(byte_str) < OPTIONS_START_OFFSET + 1:
             logging.error("Invalid byte string for packet.")
             return
-        for field in DHCP_ALL_FIELDS:
-            self._fields[field] = field.unpack(byte_str[field.offset :
-                                                        field.offset +
-                                                        field.size])
+        header = DHCP_HEADER_STRUCT.unpack_from(byte_str)
+        fields = self._fields
+        for (field, is_address), value in zip(_HEADER_FIELDS, header):
+            if is_address:
+                value = socket.inet_ntoa(value)
+            fields[field] = value
+        # Indexing a bytearray gives us option numbers and lengths as ints
+        # without an ord() call per byte.
+        octets = bytearray(byte_str)
+        packet_length = len(octets)
         offset = OPTIONS_START_OFFSET
-        domain_search_list_byte_string = ""
-        while offset < len(byte_str) and ord(byte_str[offset]) != OPTION_END:
-            data_type = ord(byte_str[offset])
+        raw_options = self._raw_options
+        get_option_by_number = DHCP_PACKET_OPTIONS_BY_NUMBER.get
+        while offset < packet_length and octets[offset] != OPTION_END:
+            data_type = octets[offset]
             offset += 1
             if data_type == OPTION_PAD:
                 continue
-            data_length = ord(byte_str[offset])
+            data_length = octets[offset]
             offset += 1
             data = byte_str[offset: offset + data_length]
             offset += data_length
-            option = get_dhcp_option_by_number(data_type)
+            option = get_option_by_number(data_type)
             if option is None:
                 logging.warning("Unsupported DHCP option found.  "
                                 "Option number: %d", data_type)
@@ -678,14 +698,11 @@ class DhcpPacket(object):
                 # multiple options with this number.  The client is expected to
                 # concatenate the byte strings together and use it as a single
                 # value.
-                domain_search_list_byte_string += data
-                continue
-            option_value = option.unpack(data)
-            if option == OPTION_PARAMETER_REQUEST_LIST:
-                logging.info("Requested options: %s", str(option_value))
-            self._options[option] = option_value
-        if domain_search_list_byte_string:
-            self._options[OPTION_DNS_DOMAIN_SEARCH_LIST] = option_value
+                data = raw_options.get(option, "") + data
+            raw_options[option] = data
+        if OPTION_PARAMETER_REQUEST_LIST in raw_options:
+            logging.info("Requested options: %s",
+                         str(self.get_option(OPTION_PARAMETER_REQUEST_LIST)))
 
 
     @property
@@ -698,11 +715,12 @@ class DhcpPacket(object):
         Checks that we have (at a minimum) values for all the required fields,
         and that the magic cookie is set correctly.
         """
+        fields = self._fields
         for field in DHCP_REQUIRED_FIELDS:
-            if self._fields.get(field) is None:
+            if fields.get(field) is None:
                 logging.warning("Missing field %s in packet.", field)
                 return False
-        if self._fields[FIELD_MAGIC_COOKIE] != FIELD_VALUE_MAGIC_COOKIE:
+        if fields[FIELD_MAGIC_COOKIE] != FIELD_VALUE_MAGIC_COOKIE:
             return False
         return True
 
@@ -716,12 +734,12 @@ class DhcpPacket(object):
 
         @returns The MessageType for this packet, or MESSAGE_TYPE_UNKNOWN.
         """
-        if (self._options.has_key(OPTION_DHCP_MESSAGE_TYPE) and
-            self._options[OPTION_DHCP_MESSAGE_TYPE] > 0 and
-            self._options[OPTION_DHCP_MESSAGE_TYPE] < len(MESSAGE_TYPE_BY_NUM)):
-            return MESSAGE_TYPE_BY_NUM[self._options[OPTION_DHCP_MESSAGE_TYPE]]
-        else:
+        type_num = self.get_option(OPTION_DHCP_MESSAGE_TYPE)
+        if type_num is None:
             return MESSAGE_TYPE_UNKNOWN
+        if type_num > 0 and type_num < len(MESSAGE_TYPE_BY_NUM):
+            return MESSAGE_TYPE_BY_NUM[type_num]
+        return MESSAGE_TYPE_UNKNOWN
 
     @property
     def transaction_id(self):
@@ -731,52 +749,74 @@ class DhcpPacket(object):
         return self._fields.get(field)
 
     def get_option(self, option):
+        if option in self._raw_options:
+            self._options[option] = option.unpack(
+                    self._raw_options.pop(option))
         return self._options.get(option)
 
     def set_field(self, field, field_value):
         self._fields[field] = field_value
 
     def set_option(self, option, option_value):
+        self._raw_options.pop(option, None)
         self._options[option] = option_value
 
+    def _decode_all_options(self):
+        """Decodes any options that are still in their on the wire form."""
+        for option in self._raw_options.keys():
+            self.get_option(option)
+
     def to_binary_string(self):
         if not self.is_valid:
             return None
-        # A list of byte strings to be joined into a single string at the end.
-        data = []
-        offset = 0
-        for field in DHCP_ALL_FIELDS:
-            if field not in self._fields:
-                continue
-            field_data = field.pack(self._fields[field])
-            while offset < field.offset:
-                # This should only happen when we're padding the fields because
-                # we're not filling in legacy BOOTP stuff.
-                data.append("\x00")
-                offset += 1
-            data.append(field_data)
-            offset += field.size
-        # Last field processed is the magic cookie, so we're ready for options.
-        # Have to process options
-        for option in DHCP_PACKET_OPTIONS:
-            option_value = self._options.get(option)
-            if option_value is None:
-                continue
+        self._decode_all_options()
+        fields = self._fields
+        # OPTION_PAD is a zero byte, so the buffer starts out fully padded.
+        packet = bytearray(DHCP_MIN_PACKET_SIZE)
+        # The legacy BOOTP fields are optional and are zero filled when unset.
+        DHCP_HEADER_STRUCT.pack_into(
+                packet, 0,
+                fields[FIELD_OP],
+                fields[FIELD_HWTYPE],
+                fields[FIELD_HWADDR_LEN],
+                fields[FIELD_RELAY_HOPS],
+                fields[FIELD_TRANSACTION_ID],
+                fields[FIELD_TIME_SINCE_START],
+                fields[FIELD_FLAGS],
+                _pack_address(fields[FIELD_CLIENT_IP]),
+                _pack_address(fields[FIELD_YOUR_IP]),
+                _pack_address(fields[FIELD_SERVER_IP]),
+                _pack_address(fields[FIELD_GATEWAY_IP]),
+                fields[FIELD_CLIENT_HWADDR],
+                fields.get(FIELD_LEGACY_SERVER_NAME, ""),
+                fields.get(FIELD_LEGACY_BOOT_FILE, ""),
+                fields[FIELD_MAGIC_COOKIE])
+        # The header ends with the magic cookie, so we're ready for options.
+        offset = OPTIONS_START_OFFSET
+        # Packets usually carry only a few options, so walk the ones that are
+        # set (in serialization order) rather than every known option.
+        options = sorted((_OPTION_ORDER[option], option, option_value)
+                         for option, option_value in self._options.iteritems()
+                         if option_value is not None and
+                            option in _OPTION_ORDER)
+        pack_option_header = DHCP_OPTION_HEADER_STRUCT.pack_into
+        option_header_size = DHCP_OPTION_HEADER_STRUCT.size
+        for _, option, option_value in options:
             serialized_value = option.pack(option_value)
-            data.append(struct.pack("BB",
-                                    option.number,
-                                    len(serialized_value)))
-            offset += 2
-            data.append(serialized_value)
-            offset += len(serialized_value)
-        data.append(chr(OPTION_END))
-        offset += 1
-        while offset < DHCP_MIN_PACKET_SIZE:
-            data.append(chr(OPTION_PAD))
-            offset += 1
-        return "".join(data)
+            value_length = len(serialized_value)
+            value_offset = offset + option_header_size
+            end = value_offset + value_length
+            # Leave room for the trailing OPTION_END.
+            if end >= len(packet):
+                packet.extend(chr(OPTION_PAD) * (end + 1 - len(packet)))
+            pack_option_header(packet, offset, option.number, value_length)
+            packet[value_offset:end] = serialized_value
+            offset = end
+        packet[offset] = OPTION_END
+        return str(packet)
 
     def __str__(self):
+        self._decode_all_options()
         options = [k.name + "=" + str(v) for k, v in self._options.items()]
         fields = [k.name + "=" + str(v) for k, v in self._fields.items()]
         return "<DhcpPacket fields=%s, options=%s>" % (fields, options)
@@ -135,7 +135,9 @@ class RPCFunctions(object):
         self._rootfs_handler = rootfs_handler.RootfsHandler()
         self._rootfs_handler.init(self._os_if)
 
-        self._updater = firmware_updater.FirmwareUpdater(self._os_if)
+        # The updater extracts the shellball when it is created; only do
+        # that once a test actually asks for it. See the _updater property.
+        self._updater_obj = None
         self._check_keys = firmware_check_keys.firmwareCheckKeys()
 
         # Initialize temporary directory path
@@ -143,6 +145,16 @@ class RPCFunctions(object):
         self._keys_path = os.path.join(self._temp_path, 'keys')
         self._work_path = os.path.join(self._temp_path, 'work')
 
+        # Filled in by the first _system_get_platform_name() call.
+        self._platform_name = None
+
+    @property
+    def _updater(self):
+        """The FirmwareUpdater, created on first use."""
+        if self._updater_obj is None:
+            self._updater_obj = firmware_updater.FirmwareUpdater(self._os_if)
+        return self._updater_obj
+
     def _dispatch(self, method, params):
         """This _dispatch method handles string conversion especially.
 
@@ -258,12 +270,17 @@ class RPCFunctions(object):
 
         @return: A string of the platform name.
         """
-        # 'mosys platform name' sometimes fails. Let's get the verbose output.
-        lines = self._os_if.run_shell_command_get_output(
-                '(mosys -vvv platform name 2>&1) || echo Failed')
-        if lines[-1].strip() == 'Failed':
-            raise Exception('Failed getting platform name: ' + '\n'.join(lines))
-        return lines[-1]
+        # The platform never changes under us, so only ask mosys once.
+        if self._platform_name is None:
+            # 'mosys platform name' sometimes fails. Let's get the verbose
+            # output.
+            lines = self._os_if.run_shell_command_get_output(
+                    '(mosys -vvv platform name 2>&1) || echo Failed')
+            if lines[-1].strip() == 'Failed':
+                raise Exception('Failed getting platform name: ' +
+                                '\n'.join(lines))
+            self._platform_name = lines[-1]
+        return self._platform_name
 
     def _system_get_crossystem_value(self, key):
         """Get crossystem value of the requested key.
@@ -391,35 +408,35 @@ class RPCFunctions(object):
         """Get SHA1 hash of firmware vblock in section."""
         return self._bios_handler.get_section_sig_sha(section)
 
-    @allow_multiple_section_input
     def _bios_corrupt_sig(self, section):
         """Corrupt the requested firmware section signature.
 
-        @param section: A firmware section, either 'a' or 'b'.
+        @param section: A firmware section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._bios_handler.corrupt_firmware(section)
 
-    @allow_multiple_section_input
     def _bios_restore_sig(self, section):
         """Restore the previously corrupted firmware section signature.
 
-        @param section: A firmware section, either 'a' or 'b'.
+        @param section: A firmware section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._bios_handler.restore_firmware(section)
 
-    @allow_multiple_section_input
     def _bios_corrupt_body(self, section):
         """Corrupt the requested firmware section body.
 
-        @param section: A firmware section, either 'a' or 'b'.
+        @param section: A firmware section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._bios_handler.corrupt_firmware_body(section)
 
-    @allow_multiple_section_input
     def _bios_restore_body(self, section):
         """Restore the previously corrupted firmware section body.
 
-        @param section: A firmware section, either 'a' or 'b'.
+        @param section: A firmware section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._bios_handler.restore_firmware_body(section)
 
@@ -487,35 +504,35 @@ class RPCFunctions(object):
         """Get SHA1 hash of EC RW firmware section."""
         return self._ec_handler.get_section_sha('rw')
 
-    @allow_multiple_section_input
     def _ec_corrupt_sig(self, section):
         """Corrupt the requested EC section signature.
 
-        @param section: A EC section, either 'a' or 'b'.
+        @param section: A EC section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._ec_handler.corrupt_firmware(section, corrupt_all=True)
 
-    @allow_multiple_section_input
     def _ec_restore_sig(self, section):
         """Restore the previously corrupted EC section signature.
 
-        @param section: An EC section, either 'a' or 'b'.
+        @param section: An EC section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._ec_handler.restore_firmware(section, restore_all=True)
 
-    @allow_multiple_section_input
     def _ec_corrupt_body(self, section):
         """Corrupt the requested EC section body.
 
-        @param section: An EC section, either 'a' or 'b'.
+        @param section: An EC section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._ec_handler.corrupt_firmware_body(section, corrupt_all=True)
 
-    @allow_multiple_section_input
     def _ec_restore_body(self, section):
         """Restore the previously corrupted EC section body.
 
-        @param section: An EC section, either 'a' or 'b'.
+        @param section: An EC section, either 'a' or 'b',
+                or a list of sections written in one flashrom run.
         """
         self._ec_handler.restore_firmware_body(section, restore_all=True)
 
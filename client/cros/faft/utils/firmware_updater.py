@@ -25,6 +25,18 @@ class FirmwareUpdater(object):
         self._temp_path = '/var/tmp/faft/autest'
         self._keys_path = os.path.join(self._temp_path, 'keys')
         self._work_path = os.path.join(self._temp_path, 'work')
+        # Paths used by every operation; join them once up front.
+        self._bios_path = os.path.join(self._work_path, 'bios.bin')
+        self._output_path = os.path.join(self._temp_path, 'output.bin')
+        self._shellball_path = os.path.join(self._temp_path,
+                                            'chromeos-firmwareupdate')
+        self._resign_keys = ' '.join(
+                os.path.join(self._keys_path, key) for key in (
+                    'firmware_data_key.vbprivk',
+                    'firmware.keyblock',
+                    'dev_firmware_data_key.vbprivk',
+                    'dev_firmware.keyblock',
+                    'kernel_subkey.vbpubk'))
 
         if not self.os_if.is_dir(self._temp_path):
             self._setup_temp_dir()
@@ -38,16 +50,16 @@ class FirmwareUpdater(object):
         """
         self.cleanup_temp_dir()
 
-        self.os_if.create_dir(self._temp_path)
-        self.os_if.create_dir(self._work_path)
-        self.os_if.copy_dir('/usr/share/vboot/devkeys', self._keys_path)
-
+        # Create the directories, copy the keys and the shellball, and extract
+        # it in a single shell round trip. _work_path lives in _temp_path, so
+        # one mkdir -p creates both.
         original_shellball = '/usr/sbin/chromeos-firmwareupdate'
-        working_shellball = os.path.join(self._temp_path,
-                                         'chromeos-firmwareupdate')
-        self.os_if.copy_file(original_shellball, working_shellball)
-        self.os_if.run_shell_command(
-            'sh %s --sb_extract %s' % (working_shellball, self._work_path))
+        self.os_if.run_shell_command(' && '.join([
+                'mkdir -p %s' % self._work_path,
+                'cp -rf /usr/share/vboot/devkeys %s' % self._keys_path,
+                'cp -f %s %s' % (original_shellball, self._shellball_path),
+                'sh %s --sb_extract %s' % (self._shellball_path,
+                                           self._work_path)]))
 
 
     def cleanup_temp_dir(self):
@@ -64,12 +76,14 @@ class FirmwareUpdater(object):
         Returns:
             Shellball's fwid.
         """
-        self.os_if.run_shell_command('dump_fmap -x %s %s' %
-            (os.path.join(self._work_path, 'bios.bin'), 'RW_FWID_A'))
+        self.os_if.run_shell_command('cd %s && dump_fmap -x %s %s' %
+            (self._temp_path, self._bios_path, 'RW_FWID_A'))
 
-        [fwid] = self.os_if.run_shell_command_get_output(
-            "cat RW_FWID_A | tr '\\0' '\\t' | cut -f1")
-        return fwid
+        # The section is NUL padded; read it directly rather than piping it
+        # through cat/tr/cut.
+        fwid = self.os_if.read_file(
+                os.path.join(self._temp_path, 'RW_FWID_A'))
+        return fwid.split('\0', 1)[0].split('\t', 1)[0].rstrip()
 
 
     def resign_firmware(self, version):
@@ -81,18 +95,13 @@ class FirmwareUpdater(object):
         ro_normal = 0
         self.os_if.run_shell_command(
                 '/usr/share/vboot/bin/resign_firmwarefd.sh '
-                '%s %s %s %s %s %s %s %d %d' % (
-                    os.path.join(self._work_path, 'bios.bin'),
-                    os.path.join(self._temp_path, 'output.bin'),
-                    os.path.join(self._keys_path, 'firmware_data_key.vbprivk'),
-                    os.path.join(self._keys_path, 'firmware.keyblock'),
-                    os.path.join(self._keys_path, 'dev_firmware_data_key.vbprivk'),
-                    os.path.join(self._keys_path, 'dev_firmware.keyblock'),
-                    os.path.join(self._keys_path, 'kernel_subkey.vbpubk'),
+                '%s %s %s %d %d' % (
+                    self._bios_path,
+                    self._output_path,
+                    self._resign_keys,
                     version,
                     ro_normal))
-        self.os_if.copy_file('%s' % os.path.join(self._temp_path, 'output.bin'),
-                             '%s' % os.path.join(self._work_path, 'bios.bin'))
+        self.os_if.copy_file(self._output_path, self._bios_path)
 
 
     def repack_shellball(self, append):
@@ -103,30 +112,20 @@ class FirmwareUpdater(object):
         Args:
             append: use for new fwid naming.
         """
-        self.os_if.copy_file(
-                '/usr/sbin/chromeos-firmwareupdate',
-                os.path.join(self._temp_path,
-                             'chromeos-firmwareupdate-%s' % append))
-
-        self.os_if.run_shell_command('sh %s --sb_repack %s' % (
-            os.path.join(self._temp_path,
-                         'chromeos-firmwareupdate-%s' % append),
-            self._work_path))
-
-        args = ['-i']
-        args.append('"s/TARGET_FWID=\\"\\(.*\\)\\"/TARGET_FWID=\\"\\1.%s\\"/g"'
-                    % append)
-        args.append(os.path.join(self._temp_path,
-                                 'chromeos-firmwareupdate-%s' % append))
-        cmd = 'sed %s' % ' '.join(args)
-        self.os_if.run_shell_command(cmd)
+        working_shellball = '%s-%s' % (self._shellball_path, append)
+        self.os_if.copy_file('/usr/sbin/chromeos-firmwareupdate',
+                             working_shellball)
 
+        # Repack and patch the shellball in a single shell round trip; sed
+        # applies both substitutions in one pass over the file.
         args = ['-i']
-        args.append('"s/TARGET_UNSTABLE=\\".*\\"/TARGET_UNSTABLE=\\"\\"/g"')
-        args.append(os.path.join(self._temp_path,
-                                 'chromeos-firmwareupdate-%s' % append))
-        cmd = 'sed %s' % ' '.join(args)
-        self.os_if.run_shell_command(cmd)
+        args.append(
+                '-e "s/TARGET_FWID=\\"\\(.*\\)\\"/TARGET_FWID=\\"\\1.%s\\"/g"'
+                % append)
+        args.append('-e "s/TARGET_UNSTABLE=\\".*\\"/TARGET_UNSTABLE=\\"\\"/g"')
+        args.append(working_shellball)
+        self.os_if.run_shell_command('sh %s --sb_repack %s && sed %s' % (
+            working_shellball, self._work_path, ' '.join(args)))
 
 
     def run_firmwareupdate(self, mode, updater_append=None, options=[]):
@@ -141,10 +140,9 @@ class FirmwareUpdater(object):
                 no option.
         """
         if updater_append:
-            updater = os.path.join(
-                self._temp_path, 'chromeos-firmwareupdate-%s' % updater_append)
+            updater = '%s-%s' % (self._shellball_path, updater_append)
         else:
-            updater = os.path.join(self._temp_path, 'chromeos-firmwareupdate')
+            updater = self._shellball_path
 
         self.os_if.run_shell_command(
             '/bin/sh %s --mode %s %s' % (updater, mode, ' '.join(options)))
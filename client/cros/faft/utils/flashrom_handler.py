@@ -149,22 +149,26 @@ class FlashromHandler(object):
 
         if image_file:
             self.image = open(image_file, 'rb').read()
-            self.fum.set_firmware_layout(image_file)
+            self.fum.set_firmware_layout(image_file, len(self.image))
         else:
             self.image = self.fum.read_whole()
 
         for section in self.fv_sections.itervalues():
+            # Slice each subsection out of the image only once; the body
+            # blobs are megabytes and get_section() trims their padding.
+            blobs = {}
             for subsection_name in section.names():
                 if not subsection_name:
                     continue
                 blob = self.fum.get_section(self.image, subsection_name)
+                blobs[subsection_name] = blob
                 if blob:
                     f = open(self.os_if.state_dir_file(subsection_name),
                              'wb')
                     f.write(blob)
                     f.close()
 
-            blob = self.fum.get_section(self.image, section.get_body_name())
+            blob = blobs[section.get_body_name()]
             if blob:
                 s = hashlib.sha1()
                 s.update(blob)
@@ -175,8 +179,7 @@ class FlashromHandler(object):
                 continue
 
             # Now determine this section's version number.
-            vb_section = self.fum.get_section(
-                self.image, section.get_sig_name())
+            vb_section = blobs[section.get_sig_name()]
 
             section.set_version(self.os_if.retrieve_body_version(vb_section))
             section.set_flags(self.os_if.retrieve_preamble_flags(vb_section))
@@ -186,7 +189,7 @@ class FlashromHandler(object):
                 self.os_if.retrieve_kernel_subkey_version(vb_section))
 
             s = hashlib.sha1()
-            s.update(self.fum.get_section(self.image, section.get_sig_name()))
+            s.update(vb_section)
             section.set_sig_sha(s.hexdigest())
 
         if not self.pub_key_file:
@@ -279,13 +282,15 @@ class FlashromHandler(object):
         # Modify the byte in it within 2% of the section blob.
         modified_index = len(blob) / 50
         if corrupt_all:
-            blob_list = [('%c' % ((ord(x) + delta) % 0x100)) for x in blob]
+            # Add delta to every byte in one pass with a translation table
+            # rather than a Python level loop over the whole section.
+            table = ''.join(chr((i + delta) % 0x100) for i in xrange(0x100))
+            blob = blob.translate(table)
         else:
-            blob_list = list(blob)
-            blob_list[modified_index] = ('%c' %
-                    ((ord(blob[modified_index]) + delta) % 0x100))
-        self.image = self.fum.put_section(self.image,
-                                          subsection_name, ''.join(blob_list))
+            blob = bytearray(blob)
+            blob[modified_index] = (blob[modified_index] + delta) % 0x100
+            blob = str(blob)
+        self.image = self.fum.put_section(self.image, subsection_name, blob)
 
         return subsection_name
 
@@ -313,31 +318,42 @@ class FlashromHandler(object):
         return self._modify_section(section, -self.DELTA, body_or_sig=True,
                                     corrupt_all=restore_all)
 
+    def _modify_firmware(self, modifier, sections, **kargs):
+        """Modify one or more sections and write them to the FLASHROM at once.
+
+        Args:
+          modifier - one of the *_section methods, applied to each section.
+          sections - a section name, or a list/tuple of section names.
+        """
+        if type(sections) not in (tuple, list):
+            sections = (sections, )
+        subsection_names = tuple(modifier(section, **kargs)
+                                 for section in sections)
+        self.fum.write_partial(self.image, subsection_names)
+
     def corrupt_firmware(self, section, corrupt_all=False):
         """Corrupt a section signature in the FLASHROM!!!"""
 
-        subsection_name = self.corrupt_section(section, corrupt_all=corrupt_all)
-        self.fum.write_partial(self.image, (subsection_name, ))
+        self._modify_firmware(self.corrupt_section, section,
+                              corrupt_all=corrupt_all)
 
     def corrupt_firmware_body(self, section, corrupt_all=False):
         """Corrupt a section body in the FLASHROM!!!"""
 
-        subsection_name = self.corrupt_section_body(section,
-                                                    corrupt_all=corrupt_all)
-        self.fum.write_partial(self.image, (subsection_name, ))
+        self._modify_firmware(self.corrupt_section_body, section,
+                              corrupt_all=corrupt_all)
 
     def restore_firmware(self, section, restore_all=False):
         """Restore the previously corrupted section sig in the FLASHROM!!!"""
 
-        subsection_name = self.restore_section(section, restore_all=restore_all)
-        self.fum.write_partial(self.image, (subsection_name, ))
+        self._modify_firmware(self.restore_section, section,
+                              restore_all=restore_all)
 
     def restore_firmware_body(self, section, restore_all=False):
         """Restore the previously corrupted section body in the FLASHROM!!!"""
 
-        subsection_name = self.restore_section_body(section,
-                                                    restore_all=False)
-        self.fum.write_partial(self.image, (subsection_name, ))
+        self._modify_firmware(self.restore_section_body, section,
+                              restore_all=False)
 
     def firmware_sections_equal(self):
         """Check if firmware sections A and B are equal.
@@ -121,7 +121,7 @@ class LayoutScraper(object):
             raise TestError('Section end 0x%x exceeds file size %x' % (
                     base, file_size))
 
-    def get_layout(self, file_name):
+    def get_layout(self, file_name, file_size=None):
         """Generate layout for a firmware file.
 
         First retrieve the text layout as reported by 'mosys' and then convert
@@ -132,7 +132,8 @@ class LayoutScraper(object):
         section in the firmware file.
 
         Then verify the generated layout's consistency and return it to the
-        caller.
+        caller. If the caller already holds the file contents it can pass
+        their length as file_size to save querying the DUT for it.
         """
 
         layout_data = {} # keyed by the section name, elements - tuples of
@@ -152,7 +153,9 @@ class LayoutScraper(object):
             size = int(d['area_size'], 0)
             layout_data[name] = (offset, offset + size - 1)
 
-        self.check_layout(layout_data, self.os_if.get_file_size(file_name))
+        if file_size is None:
+            file_size = self.os_if.get_file_size(file_name)
+        self.check_layout(layout_data, file_size)
         return layout_data
 
 # flashrom utility wrapper
@@ -214,6 +217,12 @@ class flashrom_util(object):
             self._enable_ec_access()
         else:
             self._enable_bios_access()
+        # The target never changes, so build the command templates once.
+        flashrom = 'flashrom %s' % self._target_command
+        self._read_command = flashrom + ' -r "%s"'
+        self._write_command = flashrom + ' -l "%s" -i %s -w "%s"'
+        self._wp_enable_command = flashrom + ' --wp-enable'
+        self._wp_disable_command = flashrom + ' --wp-disable'
 
     def _enable_bios_access(self):
         if not self.os_if.target_hosted():
@@ -233,8 +242,8 @@ class flashrom_util(object):
         """Removes a temp file if self.keep_temp_files is false."""
         if self.keep_temp_files:
             return
-        if self.os_if.path_exists(filename):
-            self.os_if.remove_file(filename)
+        # remove_file() uses 'rm -f', so a missing file needs no probe.
+        self.os_if.remove_file(filename)
 
     def _create_layout_file(self, layout_map):
         """Creates a layout file based on layout_map.
@@ -297,21 +306,19 @@ class flashrom_util(object):
         image = self.read_whole()
         return len(image)
 
-    def set_firmware_layout(self, file_name):
+    def set_firmware_layout(self, file_name, file_size=None):
         """get layout read from the BIOS """
 
         scraper = LayoutScraper(self.os_if)
-        self.firmware_layout = scraper.get_layout(file_name)
+        self.firmware_layout = scraper.get_layout(file_name, file_size)
 
     def enable_write_protect(self):
         """Enable the write pretection of the flash chip."""
-        cmd = 'flashrom %s --wp-enable' % self._target_command
-        self.os_if.run_shell_command(cmd)
+        self.os_if.run_shell_command(self._wp_enable_command)
 
     def disable_write_protect(self):
         """Disable the write pretection of the flash chip."""
-        cmd = 'flashrom %s --wp-disable' % self._target_command
-        self.os_if.run_shell_command(cmd)
+        self.os_if.run_shell_command(self._wp_disable_command)
 
     def read_whole(self):
         """
@@ -319,11 +326,11 @@ class flashrom_util(object):
         Returns the data read from flash ROM, or empty string for other error.
         """
         tmpfn = self._get_temp_filename('rd_')
-        cmd = 'flashrom %s -r "%s"' % (self._target_command, tmpfn)
+        cmd = self._read_command % tmpfn
         self.os_if.log('flashrom_util.read_whole(): %s' % cmd)
         self.os_if.run_shell_command(cmd)
         result = self.os_if.read_file(tmpfn)
-        self.set_firmware_layout(tmpfn)
+        self.set_firmware_layout(tmpfn, len(result))
 
         # clean temporary resources
         self._remove_temp_file(tmpfn)
@@ -344,8 +351,7 @@ class flashrom_util(object):
         self.os_if.write_file(tmpfn, base_image)
         layout_fn = self._create_layout_file(layout_map)
 
-        cmd = 'flashrom %s -l "%s" -i %s -w "%s"' % (
-                self._target_command, layout_fn, ' -i '.join(write_list), tmpfn)
+        cmd = self._write_command % (layout_fn, ' -i '.join(write_list), tmpfn)
         self.os_if.log('flashrom.write_partial(): %s' % cmd)
         self.os_if.run_shell_command(cmd)
 
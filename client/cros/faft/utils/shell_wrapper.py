@@ -4,8 +4,13 @@
 
 """A module to abstract the shell execution environment on DUT."""
 
+import atexit
+import os
+import pipes
+import StringIO
 import subprocess
 import tempfile
+import threading
 
 
 class ShellError(Exception):
@@ -13,25 +18,121 @@ class ShellError(Exception):
     pass
 
 
+class CommandResult(object):
+    """The outcome of a command run by the persistent shell.
+
+    Provides the subset of the subprocess.Popen() interface the callers use:
+    returncode and file-like stdout and stderr.
+    """
+
+    def __init__(self, returncode, stdout, stderr):
+        self.returncode = returncode
+        self.stdout = StringIO.StringIO(stdout)
+        self.stderr = StringIO.StringIO(stderr)
+
+
 class LocalShell(object):
-    """An object to wrap the local shell environment."""
+    """An object to wrap the local shell environment.
+
+    Blocking commands are fed to one long-lived /bin/sh rather than forking
+    a new shell out of this Python process for every call. Each command runs
+    in a subshell, from the current working directory of this process, so it
+    cannot change the state of the persistent shell.
+    """
+
+    _DONE_MARKER = '__faft_shell_done__'
+    # Firmware images pass through the file helpers; use large buffers.
+    _FILE_BUFFER_SIZE = 256 * 1024
 
     def init(self, os_if):
         self._os_if = os_if
+        self._shell = None
+        self._lock = threading.Lock()
+        self._output_files = None
+        atexit.register(self.close)
+
+    def _start_shell(self):
+        """(Re)start the persistent shell."""
+        if self._output_files is None:
+            self._output_files = []
+            for prefix in ('faft_stdout_', 'faft_stderr_'):
+                fd, path = tempfile.mkstemp(prefix=prefix)
+                os.close(fd)
+                self._output_files.append(path)
+        self._shell = subprocess.Popen(['/bin/sh'], stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, close_fds=True)
+
+    def _stop_shell(self):
+        """Stop the persistent shell, if any, and reap it."""
+        shell, self._shell = self._shell, None
+        if shell is None:
+            return
+        try:
+            shell.stdin.close()
+        except IOError:
+            pass
+        if shell.poll() is None:
+            shell.kill()
+        shell.wait()
+
+    def close(self):
+        """Stop the persistent shell and remove its output files."""
+        with self._lock:
+            self._stop_shell()
+            for path in self._output_files or []:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            self._output_files = None
+
+    def _run_in_shell(self, cmd):
+        """Run cmd in the persistent shell and return a CommandResult."""
+        with self._lock:
+            if self._shell is None or self._shell.poll() is not None:
+                self._start_shell()
+            stdout_file, stderr_file = self._output_files
+            script = '(cd %s; eval %s) <%s >%s 2>%s; echo %s $?\n' % (
+                    pipes.quote(os.getcwd()), pipes.quote(cmd), os.devnull,
+                    pipes.quote(stdout_file), pipes.quote(stderr_file),
+                    self._DONE_MARKER)
+            try:
+                try:
+                    self._shell.stdin.write(script)
+                    self._shell.stdin.flush()
+                    line = self._shell.stdout.readline()
+                except IOError:
+                    line = ''
+                if not line.startswith(self._DONE_MARKER):
+                    raise ShellError('shell exited while running: %s' % cmd)
+                returncode = int(line.split()[1])
+                outputs = []
+                for path in self._output_files:
+                    with open(path, 'rb') as f:
+                        outputs.append(f.read())
+            except:
+                # The command may still be running, or its status may be left
+                # unread in the pipe; never hand that shell another command.
+                self._stop_shell()
+                raise
+        return CommandResult(returncode, *outputs)
 
     def _run_command(self, cmd, block=True):
         """Helper function of run_command() methods.
 
-        Return the subprocess.Popen() instance to provide access to console
-        output in case command succeeded.  If block=False, will not wait for
-        process to return before returning.
+        Return an object with the subprocess.Popen() returncode, stdout and
+        stderr attributes to provide access to console output in case command
+        succeeded.  If block=False, will not wait for process to return
+        before returning; such commands get a subprocess of their own, whose
+        output is discarded since nobody is left to drain a pipe and a chatty
+        command would otherwise stall once the pipe buffer filled up.
         """
         self._os_if.log('Executing %s' % cmd)
-        process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE)
         if block:
-            process.wait()
-        return process
+            return self._run_in_shell(cmd)
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.Popen(cmd, shell=True, stdout=devnull,
+                                    stderr=devnull, close_fds=True)
 
     def run_command(self, cmd, block=True):
         """Run a shell command.
@@ -73,17 +174,17 @@ class LocalShell(object):
 
     def read_file(self, path):
         """Read the content of the file."""
-        with open(path) as f:
+        with open(path, 'rb', self._FILE_BUFFER_SIZE) as f:
             return f.read()
 
     def write_file(self, path, data):
         """Write the data to the file."""
-        with open(path, 'w') as f:
+        with open(path, 'wb', self._FILE_BUFFER_SIZE) as f:
             f.write(data)
 
     def append_file(self, path, data):
         """Append the data to the file."""
-        with open(path, 'a') as f:
+        with open(path, 'ab', self._FILE_BUFFER_SIZE) as f:
             f.write(data)
 
 
@@ -113,9 +113,12 @@ class KernelConfig():
             expected.add('CONFIG_%s' % (name))
 
         # Now make sure nothing else with the specified regex exists.
+        # Compile the pattern once rather than resolving it through the re
+        # module cache for every config item.
         regex = r'CONFIG_%s' % (exclusive['regex'])
+        match = re.compile(regex).match
         for name in self._config:
-            if not re.match(regex, name):
+            if not match(name):
                 continue
             if not name in expected:
                 self._failed('"%s" found for "%s" when only "%s" allowed' %
@@ -146,13 +149,15 @@ class KernelConfig():
         """
         fileobj = self._open_config()
         # Import kernel config variables into a dictionary for each searching.
+        # Stream the lines rather than materializing them all with readlines().
         config = dict()
-        for item in fileobj.readlines():
-            item = item.strip()
-            if not '=' in item:
-                continue
-            key, value = item.split('=', 1)
-            config[key] = value
+        try:
+            for item in fileobj:
+                key, sep, value = item.strip().partition('=')
+                if sep:
+                    config[key] = value
+        finally:
+            fileobj.close()
 
         # Make sure we actually loaded something sensible.
         if len(config) == 0:
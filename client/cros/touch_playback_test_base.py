@@ -80,11 +80,16 @@ class touch_playback_test_base(test.test):
 
         filepaths = {}
         gesture_dir = os.path.join(self.bindir, 'gestures')
+        # List the directory once instead of stat'ing every candidate file.
+        try:
+            available = set(os.listdir(gesture_dir))
+        except OSError:
+            available = set()
         for gesture in gestures:
             filename = '%s_%s_%s_%s' % (self._platform, input_type, hw_id,
                                         gesture)
             filepath = os.path.join(gesture_dir, filename)
-            if not os.path.exists(filepath):
+            if filename not in available:
                 logging.info('Did not find %s!', filepath)
                 return None
             filepaths[gesture] = filepath
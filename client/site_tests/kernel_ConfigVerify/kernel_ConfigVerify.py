@@ -140,17 +140,18 @@ class kernel_ConfigVerify(test.test):
         arch = utils.get_arch()
         userspace_arch = utils.get_arch_userspace()
 
-        # Report the full uname for anyone reading logs.
+        # Report the full uname for anyone reading logs. os.uname() has the
+        # same fields as 'uname -a' without forking it.
+        uname = os.uname()
         logging.info('Running %s kernel, %s userspace: %s',
-                     arch, userspace_arch,
-                     utils.system_output('uname -a'))
+                     arch, userspace_arch, ' '.join(uname))
 
         # Load the list of kernel config variables.
         config = kernel_config.KernelConfig()
         config.initialize()
 
         # Adjust for kernel-version-specific changes
-        kernel_ver = os.uname()[2]
+        kernel_ver = uname[2]
         if utils.compare_versions(kernel_ver, "3.10") >= 0:
             for entry in self.IS_EXCLUSIVE:
                 if entry['regex'] == 'BINFMT_':
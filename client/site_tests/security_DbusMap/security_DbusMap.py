@@ -306,12 +306,13 @@ class security_DbusMap(test.test):
             dbus_list: list of dbus dictionaries to write to disk.
             file_path: the path to the file to write the data to.
         """
-        file_handle = open(file_path, 'w')
-        my_json = json.dumps(dbus_list, sort_keys=True, indent=2)
-        # The json dumper has a trailing whitespace problem, and lacks
-        # a final newline. Fix both here.
-        file_handle.write(my_json.replace(', \n',',\n') + '\n')
-        file_handle.close()
+        # Stream the JSON straight to the file. The default ', ' item
+        # separator leaves trailing whitespace after indented items, and the
+        # dumper lacks a final newline. Fix both here.
+        with open(file_path, 'w', 256 * 1024) as file_handle:
+            json.dump(dbus_list, file_handle, sort_keys=True, indent=2,
+                      separators=(',', ': '))
+            file_handle.write('\n')
 
 
     def load_dbus_data_from_disk(self, file_path):
@@ -2,10 +2,10 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
-import itertools
 import logging
 import time
 
+from autotest_lib.client.bin import utils
 from autotest_lib.client.common_lib import error
 from autotest_lib.client.common_lib.cros import chrome
 from autotest_lib.client.cros import touch_playback_test_base
@@ -16,9 +16,12 @@ class touch_TapSettings(touch_playback_test_base.touch_playback_test_base):
     version = 1
 
     _TEST_TIMEOUT = 1  # Number of seconds the test will wait for a click.
+    _CLICK_SETTLE_TIME = 0.25  # Seconds to wait for extra clicks after one.
     _MOUSE_DESCRIPTION = 'apple_mouse.prop'
     _CLICK_NAME = 'tap-click'
     _DRAG_NAME = 'tap-drag-right'
+    # (tap-to-click, tap dragging) settings to test after the defaults.
+    _SETTING_SCHEDULE = ((True, True), (False, True), (False, False))
 
 
     def _check_for_click(self, expected):
@@ -31,7 +34,20 @@ class touch_TapSettings(touch_playback_test_base.touch_playback_test_base):
         expected_count = 1 if expected else 0
         self._reload_page()
         self._playback(self._filepaths[self._CLICK_NAME])
-        time.sleep(self._TEST_TIMEOUT)
+        if expected:
+            # Move on as soon as the click registers rather than always
+            # sleeping for the whole timeout, then give a spurious second
+            # click a moment to show up before the count is re-read below.
+            try:
+                utils.poll_for_condition(
+                        lambda: self._tab.EvaluateJavaScript('clickCount'),
+                        timeout=self._TEST_TIMEOUT)
+                time.sleep(self._CLICK_SETTLE_TIME)
+            except utils.TimeoutError:
+                pass
+        else:
+            # Proving that no click happens takes the full timeout.
+            time.sleep(self._TEST_TIMEOUT)
         actual_count = int(self._tab.EvaluateJavaScript('clickCount'))
         if actual_count is not expected_count:
             raise error.TestFail('Expected clicks=%s, actual=%s.'
@@ -92,12 +108,16 @@ class touch_TapSettings(touch_playback_test_base.touch_playback_test_base):
             self._check_for_click(True)
             self._check_for_drag(False)
 
-            # Toggle settings in all combinations and check.
-            options = [True, False]
-            option_pairs = itertools.product(options, options)
-            for (click_value, drag_value) in option_pairs:
+            # Toggle settings through the remaining combinations and check.
+            # The defaults (click on, drag off) were covered above, and each
+            # step below flips a single setting.
+            click_value, drag_value = True, False
+            for (new_click, new_drag) in self._SETTING_SCHEDULE:
                 self._center_cursor()
-                self._set_tap_to_click(click_value)
-                self._set_tap_dragging(drag_value)
+                if new_click != click_value:
+                    self._set_tap_to_click(new_click)
+                if new_drag != drag_value:
+                    self._set_tap_dragging(new_drag)
+                click_value, drag_value = new_click, new_drag
                 self._check_for_click(click_value)
                 self._check_for_drag(click_value and drag_value)
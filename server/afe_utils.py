@@ -13,7 +13,21 @@ import common
 from autotest_lib.server import utils
 from autotest_lib.server.cros.dynamic_suite import frontend_wrappers
 
-AFE = frontend_wrappers.RetryingAFE(timeout_min=5, delay_sec=10)
+_AFE = None
+
+
+def _afe():
+    """Get the AFE client shared by this module, creating it on first use.
+
+    Many tests import this module without ever talking to the AFE, so the
+    client is not built at import time.
+
+    @returns A RetryingAFE instance.
+    """
+    global _AFE
+    if _AFE is None:
+        _AFE = frontend_wrappers.RetryingAFE(timeout_min=5, delay_sec=10)
+    return _AFE
 
 
 def host_in_lab(host):
@@ -24,13 +38,21 @@ def host_in_lab(host):
     case it then verifies the host is registed with the configured AFE
     instance.
 
+    A host does not join or leave the AFE in the middle of a job, so the AFE
+    lookup is done once and remembered on the host object; the provisioning
+    helpers below all start with this check.
+
     @param host: Host object to verify.
 
-    @returns The host model object.
+    @returns The host model object, as fetched on the first call.
     """
     if not host.job or not host.job.in_lab:
         return False
-    return AFE.get_hosts(hostname=host.hostname)
+    afe_hosts = getattr(host, '_afe_hosts', None)
+    if afe_hosts is None:
+        afe_hosts = _afe().get_hosts(hostname=host.hostname)
+        host._afe_hosts = afe_hosts
+    return afe_hosts
 
 
 def get_build(host):
@@ -45,7 +67,7 @@ def get_build(host):
     """
     if not host_in_lab(host):
         return None
-    return utils.get_build_from_afe(host.hostname, AFE)
+    return utils.get_build_from_afe(host.hostname, _afe())
 
 
 def get_board(host):
@@ -59,24 +81,42 @@ def get_board(host):
     """
     if not host_in_lab(host):
         return None
-    return utils.get_board_from_afe(host.hostname, AFE)
+    return utils.get_board_from_afe(host.hostname, _afe())
 
 
-def clear_version_labels(host):
-    """Clear version labels for a given host.
+def _clear_version_labels(host):
+    """Clear version labels for a host already known to be in the lab.
 
     @param host: Host whose version labels to clear.
     """
-    if not host_in_lab(host):
-        return
-
-    host_list = [host.hostname]
-    labels = AFE.get_labels(
+    labels = _afe().get_labels(
             name__startswith=host.VERSION_PREFIX,
             host__hostname=host.hostname)
 
-    for label in labels:
-        label.remove_hosts(hosts=host_list)
+    # Drop all of them in a single RPC rather than one label_remove_hosts
+    # round trip per label.
+    if labels:
+        _afe().run('host_remove_labels', id=host.hostname,
+                   labels=[label.id for label in labels])
+
+
+def _add_version_label(host, image_name):
+    """Add a version label to a host already known to be in the lab.
+
+    @param host: Host to add the version label for.
+    @param image_name: Name of the build version to add to the host.
+    """
+    label = '%s:%s' % (host.VERSION_PREFIX, image_name)
+    _afe().run('label_add_hosts', id=label, hosts=[host.hostname])
+
+
+def clear_version_labels(host):
+    """Clear version labels for a given host.
+
+    @param host: Host whose version labels to clear.
+    """
+    if host_in_lab(host):
+        _clear_version_labels(host)
 
 
 def add_version_label(host, image_name):
@@ -85,22 +125,26 @@ def add_version_label(host, image_name):
     @param host: Host to add the version label for.
     @param image_name: Name of the build version to add to the host.
     """
-    if not host_in_lab(host):
-        return
-    label = '%s:%s' % (host.VERSION_PREFIX, image_name)
-    AFE.run('label_add_hosts', id=label, hosts=[host.hostname])
+    if host_in_lab(host):
+        _add_version_label(host, image_name)
 
 
 def machine_install_and_update_labels(host, *args, **dargs):
     """Calls machine_install and updates the version labels on a host.
 
+    The lab check is done once for the whole sequence; outside the lab this
+    is just machine_install.
+
     @param host: Host object to run machine_install on.
     @param *args: Args list to pass to machine_install.
     @param **dargs: dargs dict to pass to machine_install.
     """
-    clear_version_labels(host)
+    if not host_in_lab(host):
+        host.machine_install(*args, **dargs)
+        return
+    _clear_version_labels(host)
     image_name = host.machine_install(*args, **dargs)
-    add_version_label(host, image_name)
+    _add_version_label(host, image_name)
 
 
 def get_stable_version(board, android=False):
@@ -114,4 +158,4 @@ def get_stable_version(board, android=False):
 
     @returns Stable version of the given board.
     """
-    return AFE.run('get_stable_version', board=board, android=android)
+    return _afe().run('get_stable_version', board=board, android=android)
@@ -69,10 +69,28 @@ class FAFTCheckers(object):
         @param suppress_logging: True to suppress any logging messages.
         @return: True if the crossystem value matched; otherwise, False.
         """
-        succeed = True
+        return self._match_crossystem_values(self._get_crossystem_values(),
+                                             expected_dict, suppress_logging)
+
+    def _get_crossystem_values(self):
+        """Read all the crossystem values in one call.
+
+        @return: A dict which contains the crossystem keys/values.
+        """
         lines = self.faft_client.system.run_shell_command_get_output(
                 'crossystem')
-        got_dict = self._parse_crossystem_output(lines)
+        return self._parse_crossystem_output(lines)
+
+    def _match_crossystem_values(self, got_dict, expected_dict,
+                                 suppress_logging=False):
+        """Check already fetched crossystem values against expected ones.
+
+        @param got_dict: A dict of the current crossystem values.
+        @param expected_dict: A dict which contains the expected values.
+        @param suppress_logging: True to suppress any logging messages.
+        @return: True if the crossystem value matched; otherwise, False.
+        """
+        succeed = True
         for key in expected_dict:
             if key not in got_dict:
                 logging.warn('Expected key %r not in crossystem result', key)
@@ -191,7 +209,17 @@ class FAFTCheckers(object):
         """
         lines = self.faft_client.system.run_shell_command_get_output(
                     'crossystem vdat_flags')
-        vdat_flags = int(lines[0], 16)
+        return self._match_vdat_flags(lines[0], mask, value)
+
+    def _match_vdat_flags(self, vdat_flags, mask, value):
+        """Check already fetched VbSharedData flags against a value.
+
+        @param vdat_flags: A hex string of the flags, as crossystem reports.
+        @param mask: A bitmask of flags to be matched.
+        @param value: An expected value.
+        @return: True if the flags matched; otherwise, False.
+        """
+        vdat_flags = int(vdat_flags, 16)
         if vdat_flags & mask != value:
             logging.info("Expected vdat_flags 0x%x mask 0x%x but got 0x%x",
                          value, mask, vdat_flags)
@@ -212,10 +240,19 @@ class FAFTCheckers(object):
         if expected_fw:
             crossystem_dict['mainfw_act'] = expected_fw.upper()
         succeed = True
-        if not self.vdat_flags_checker(vboot.VDAT_FLAG_LF_USE_RO_NORMAL,
-                0 if twostop else vboot.VDAT_FLAG_LF_USE_RO_NORMAL):
+        # vdat_flags is part of the full crossystem listing, so both checks
+        # are served by a single crossystem call.
+        got_dict = self._get_crossystem_values()
+        mask = vboot.VDAT_FLAG_LF_USE_RO_NORMAL
+        expected_flags = 0 if twostop else vboot.VDAT_FLAG_LF_USE_RO_NORMAL
+        if 'vdat_flags' in got_dict:
+            vdat_matched = self._match_vdat_flags(got_dict['vdat_flags'],
+                                                  mask, expected_flags)
+        else:
+            vdat_matched = self.vdat_flags_checker(mask, expected_flags)
+        if not vdat_matched:
             succeed = False
-        if not self.crossystem_checker(crossystem_dict):
+        if not self._match_crossystem_values(got_dict, crossystem_dict):
             succeed = False
         if self.faft_framework.check_ec_capability(suppress_warning=True):
             expected_ec = ('RW' if twostop else 'RO')
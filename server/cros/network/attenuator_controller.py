@@ -208,9 +208,12 @@ class AttenuatorController(object):
         hostname = host.hostname
         if hostname.find('.') > 0:
             hostname = hostname[0:hostname.find('.')]
-        if hostname not in HOST_TO_FIXED_ATTENUATIONS.keys():
+        if hostname not in HOST_TO_FIXED_ATTENUATIONS:
             raise error.TestError('Unexpected RvR host name %r.' % hostname)
         self._fixed_attenuations = HOST_TO_FIXED_ATTENUATIONS[hostname]
+        # Maps (attenuator number, frequency) -> fixed loss in dB, filled in
+        # as frequencies are requested.
+        self._fixed_loss_cache = {}
         logging.info('Configuring GPIO ports on attenuator host.')
         for attenuator in self.supported_attenuators:
             for gpio_pin in VARIABLE_ATTENUATORS[attenuator]:
@@ -244,6 +247,25 @@ class AttenuatorController(object):
         return approx_freq
 
 
+    def _fixed_loss(self, attenuator_num, freq):
+        """Get the fixed loss of an attenuator line at a given frequency.
+
+        RvR tests step through many attenuation levels at the same frequency,
+        so the approximated loss is remembered per (attenuator, frequency).
+
+        @param attenuator_num: attenuator in question on the remote host.
+        @param freq: int frequency in MHz.
+        @returns int fixed loss in dB.
+
+        """
+        key = (attenuator_num, freq)
+        if key not in self._fixed_loss_cache:
+            approx_freq = self._approximate_frequency(attenuator_num, freq)
+            self._fixed_loss_cache[key] = (
+                    self._fixed_attenuations[attenuator_num][approx_freq])
+        return self._fixed_loss_cache[key]
+
+
     def _enable_gpio_pin(self, gpio_pin):
         """Enable a pin's GPIO function.
 
@@ -315,10 +337,8 @@ class AttenuatorController(object):
         if attenuator_num is not None:
             affected_attenuators = [attenuator_num]
         for attenuator in affected_attenuators:
-            freq_to_fixed_loss = self._fixed_attenuations[attenuator]
-            approx_freq = self._approximate_frequency(attenuator,
-                                                      frequency_mhz)
-            variable_atten_db = atten_db - freq_to_fixed_loss[approx_freq]
+            variable_atten_db = atten_db - self._fixed_loss(attenuator,
+                                                            frequency_mhz)
             self.set_variable_attenuation(variable_atten_db,
                                           attenuator_num=attenuator)
 
@@ -17,6 +17,7 @@ from autotest_lib.client.common_lib import global_config
 from autotest_lib.client.common_lib import lsbrelease_utils
 from autotest_lib.client.common_lib.cros import autoupdater
 from autotest_lib.client.common_lib.cros import dev_server
+from autotest_lib.client.common_lib.cros import retry
 from autotest_lib.client.common_lib.cros.graphite import autotest_es
 from autotest_lib.client.common_lib.cros.graphite import autotest_stats
 from autotest_lib.client.cros import constants as client_constants
@@ -416,24 +417,41 @@ class CrosHost(abstract_ssh.AbstractSSHHost):
             repo_url = tools.get_package_url(devserver_url, image_name)
         self._AFE.set_host_attribute(ds_constants.JOB_REPO_URL, repo_url,
                                      hostname=self.hostname)
+        self._verify_job_repo_url(repo_url)
+
+
+    @retry.retry(error.AutoservError, timeout_min=0.5, delay_sec=2)
+    def _verify_job_repo_url(self, repo_url):
+        """Check that the AFE reports the given job_repo_url for this host.
+
+        The attribute may take a moment to show up under AFE load, so a
+        mismatch is retried with a jittered delay before giving up.
+
+        @param repo_url: The job_repo_url the host is expected to have.
+
+        @raises AutoservError: If the AFE still reports another value.
+        """
         if self.lookup_job_repo_url() != repo_url:
             raise error.AutoservError('Failed to update job_repo_url with %s, '
                                       'host %s' % (repo_url, self.hostname))
 
 
-    def add_job_repo_url(self, image_name):
+    def add_job_repo_url(self, image_name, devserver=None):
         """Add cros_version labels and host attribute job_repo_url.
 
         @param image_name: The name of the image e.g.
                 lumpy-release/R27-3837.0.0
+        @param devserver: The devserver the image was staged on, if the caller
+                already resolved one. Otherwise a devserver is resolved here.
 
         """
         if not afe_utils.host_in_lab(self):
             return
 
-        devserver_url = dev_server.ImageServer.resolve(image_name,
-                                                       self.hostname).url()
-        self.update_job_repo_url(devserver_url, image_name)
+        if devserver is None:
+            devserver = dev_server.ImageServer.resolve(image_name,
+                                                       self.hostname)
+        self.update_job_repo_url(devserver.url(), image_name)
 
 
     def verify_job_repo_url(self, tag=''):
@@ -831,7 +849,7 @@ class CrosHost(abstract_ssh.AbstractSSHHost):
 
         self._post_update_processing(updater, inactive_kernel)
         image_name = autoupdater.url_to_image_name(update_url)
-        self.add_job_repo_url(image_name)
+        self.add_job_repo_url(image_name, devserver)
         return image_name
 
 
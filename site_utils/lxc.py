@@ -20,12 +20,15 @@ container, e.g.,
 
 
 import argparse
+import errno
 import logging
 import os
 import re
 import socket
 import sys
+import threading
 import time
+from multiprocessing import pool
 
 import common
 from autotest_lib.client.bin import utils
@@ -74,6 +77,9 @@ CONTROL_TEMP_PATH = os.path.join(lxc_config.CONTAINER_AUTOTEST_DIR, 'drone_tmp')
 # so the command can return an error code if the directory doesn't exist.
 COUNT_FILE_CMD = '[ -d %(dir)s ] && ls %(dir)s | wc -l'
 
+# tar flag to decompress an archive streamed in from stdin, by file extension.
+TAR_COMPRESSION_FLAGS = {'.tar': '', '.bz2': 'j', '.gz': 'z', '.xz': 'J'}
+
 # Command line to append content to a file
 APPEND_CMD_FMT = ('echo \'%(content)s\' | sudo tee --append %(file)s'
                   '> /dev/null')
@@ -92,24 +98,51 @@ IS_MOBLAB = utils.is_moblab()
 # TODO(crbug.com/464834): Snapshot clone is disabled until Moblab can
 # support overlayfs or aufs, which requires a newer kernel.
 SUPPORT_SNAPSHOT_CLONE = not IS_MOBLAB
+# Whether the drone is a virtual machine. Looked up by _is_vm() on the first
+# snapshot clone, as it cannot change while the process runs.
+_IS_VM = None
 
 # Number of seconds to wait for network to be up in a container.
 NETWORK_INIT_TIMEOUT = 300
 # Network bring up is slower in Moblab.
 NETWORK_INIT_CHECK_INTERVAL = 2 if IS_MOBLAB else 0.1
 
+# Number of seconds a ContainerBucket trusts its last container listing.
+# Creating a container looks the bucket up several times in a row; this saves
+# an lxc-ls call for each repeated lookup.
+CONTAINER_LIST_CACHE_SECONDS = 2
+
+# Number of containers destroy_all removes at the same time.
+DESTROY_POOL_SIZE = 8
+
 # Type string for container related metadata.
 CONTAINER_CREATE_METADB_TYPE = 'container_create'
 CONTAINER_CREATE_RETRY_METADB_TYPE = 'container_create_retry'
 CONTAINER_RUN_TEST_METADB_TYPE = 'container_run_test'
 
-STATS_KEY = 'lxc.%s' % socket.gethostname().replace('.', '_')
+# Hostname of the drone, recorded in container metadata.
+DRONE_HOSTNAME = socket.gethostname()
+STATS_KEY = 'lxc.%s' % DRONE_HOSTNAME.replace('.', '_')
 timer = autotest_stats.Timer(STATS_KEY)
 # Timer used inside container should not include the hostname, as that will
 # create individual timer for each container.
 container_timer = autotest_stats.Timer('lxc')
 
 
+def _is_vm():
+    """Check if the process is running in a virtual machine.
+
+    The answer is cached, so virt-what runs at most once per process.
+
+    @return: True if the process is running in a virtual machine, otherwise
+             return False.
+    """
+    global _IS_VM
+    if _IS_VM is None:
+        _IS_VM = utils.is_vm()
+    return _IS_VM
+
+
 def _get_container_info_moblab(container_path, **filters):
     """Get a collection of container information in the given container path
     in a Moblab.
@@ -195,6 +228,29 @@ def get_container_info(container_path, **filters):
     return info_collection
 
 
+def _post_metadata(type_str, metadata):
+    """Post container metadata to Elasticsearch from a background thread.
+
+    The metadata is only used for stats, so container setup does not wait
+    for the HTTP round trip, and a slow or hung server does not keep the
+    process from exiting.
+
+    @param type_str: Type string of the metadata.
+    @param metadata: A dictionary of the metadata to post.
+    """
+    def _post():
+        """Post the metadata, logging any failure."""
+        try:
+            autotest_es.post(use_http=True, type_str=type_str,
+                             metadata=metadata)
+        except Exception:
+            logging.exception('Failed to post %s metadata.', type_str)
+
+    post_thread = threading.Thread(target=_post)
+    post_thread.daemon = True
+    post_thread.start()
+
+
 def cleanup_if_fail():
     """Decorator to do cleanup if container fails to be set up.
     """
@@ -236,7 +292,7 @@ def cleanup_if_fail():
                             func, 'job_id', args, kwargs)
                 except (KeyError, ValueError):
                     job_id = ''
-                metadata={'drone': socket.gethostname(),
+                metadata={'drone': DRONE_HOSTNAME,
                           'job_id': job_id,
                           'success': False}
                 # Record all args if job_id is not available.
@@ -244,9 +300,7 @@ def cleanup_if_fail():
                     metadata['args'] = str(args)
                     if kwargs:
                         metadata.update(kwargs)
-                autotest_es.post(use_http=True,
-                                 type_str=CONTAINER_CREATE_METADB_TYPE,
-                                 metadata=metadata)
+                _post_metadata(CONTAINER_CREATE_METADB_TYPE, metadata)
 
                 # Raise the cached exception with original backtrace.
                 raise exc_info[0], exc_info[1], exc_info[2]
@@ -254,16 +308,77 @@ def cleanup_if_fail():
     return deco_cleanup_if_fail
 
 
+def _remove_file(path):
+    """Remove a file, without going through sudo when it is not needed.
+
+    Files such as downloaded archives are written by `sudo wget`, but they sit
+    in the container path, which this process can usually write to, so they
+    can be unlinked directly. Fall back to `sudo rm` otherwise.
+
+    @param path: Path of the file to remove.
+    """
+    try:
+        os.unlink(path)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return
+        utils.run('sudo rm -f "%s"' % path)
+
+
+def _extract(target, extract_dir):
+    """Extract the given archive.
+
+    @param target: Path of the archive.
+    @param extract_dir: Directory to extract the content of the file to.
+    """
+    utils.run('sudo tar -xvf %s -C %s' % (target, extract_dir))
+
+
 @retry.retry(error.CmdError, timeout_min=5)
-def download_extract(url, target, extract_dir):
-    """Download the file from given url and save it to the target, then extract.
+def download(url, target):
+    """Download the file from given url and save it to the target.
 
     @param url: Url to download the file.
     @param target: Path of the file to save to.
-    @param extract_dir: Directory to extract the content of the file to.
     """
     utils.run('sudo wget --timeout=300 -nv %s -O %s' % (url, target))
-    utils.run('sudo tar -xvf %s -C %s' % (target, extract_dir))
+
+
+@retry.retry(error.CmdError, timeout_min=5)
+def _stream_extract(url, extract_dir, flag):
+    """Pipe the archive at the given url from wget straight into tar.
+
+    @param url: Url to download the archive.
+    @param extract_dir: Directory to extract the content of the archive to.
+    @param flag: tar flag to decompress the archive with, see
+                 TAR_COMPRESSION_FLAGS.
+    """
+    cmd = ('set -o pipefail; wget --timeout=300 -nv -O - %s | '
+           'tar -x%sf - -C %s' % (url, flag, extract_dir))
+    utils.run('sudo bash -c "%s"' % utils.sh_escape(cmd))
+
+
+def download_extract(url, extract_dir):
+    """Download the archive from given url and extract it.
+
+    Archives with a known extension are piped from wget into tar, so they are
+    never written to disk and extraction overlaps with the download. tar can
+    not detect the compression of an archive read from a pipe, so any other
+    archive is downloaded to extract_dir first and extracted from there.
+
+    @param url: Url to download the archive.
+    @param extract_dir: Directory to extract the content of the archive to.
+    """
+    extension = os.path.splitext(url)[1]
+    if extension in TAR_COMPRESSION_FLAGS:
+        _stream_extract(url, extract_dir, TAR_COMPRESSION_FLAGS[extension])
+        return
+    target = os.path.join(extract_dir, os.path.basename(url))
+    try:
+        download(url, target)
+        _extract(target, extract_dir)
+    finally:
+        _remove_file(target)
 
 
 def install_package_precheck(packages):
@@ -572,15 +687,32 @@ class Container(object):
         @param destination: Directory in container to mount the source directory
         @param readonly: Set to True to make a readonly mount, default is False.
         """
-        # Destination path in container must be relative.
-        destination = destination.lstrip('/')
-        # Create directory in container for mount.
-        utils.run('sudo mkdir -p %s' % os.path.join(self.rootfs, destination))
+        self.mount_dirs([(source, destination, readonly)])
+
+
+    def mount_dirs(self, mount_entries):
+        """Mount several directories in host to directories in the container.
+
+        All mount points are created with one mkdir, and all mount entries are
+        appended to the container config with one write.
+
+        @param mount_entries: A list of (source, destination, readonly) tuples,
+                              see mount_dir.
+        """
+        mount_points = []
+        mounts = []
+        for source, destination, readonly in mount_entries:
+            # Destination path in container must be relative.
+            destination = destination.lstrip('/')
+            mount_points.append(os.path.join(self.rootfs, destination))
+            mounts.append(MOUNT_FMT % {'source': source,
+                                       'destination': destination,
+                                       'readonly': ',ro' if readonly else ''})
+        # Create directories in container for mount.
+        utils.run('sudo mkdir -p %s' % ' '.join(mount_points))
         config_file = os.path.join(self.container_path, self.name, 'config')
-        mount = MOUNT_FMT % {'source': source,
-                             'destination': destination,
-                             'readonly': ',ro' if readonly else ''}
-        utils.run(APPEND_CMD_FMT % {'content': mount, 'file': config_file})
+        utils.run(APPEND_CMD_FMT % {'content': '\n'.join(mounts),
+                                    'file': config_file})
 
 
     def verify_autotest_setup(self, job_id):
@@ -653,20 +785,35 @@ class ContainerBucket(object):
                                global config.
         """
         self.container_path = os.path.realpath(container_path)
+        # Containers from the last lxc-ls call, and when it was made.
+        self._containers = None
+        self._containers_time = 0
+
+
+    def _invalidate(self):
+        """Drop the cached container listing after containers change."""
+        self._containers = None
 
 
     def get_all(self):
         """Get details of all containers.
 
+        The listing is reused for CONTAINER_LIST_CACHE_SECONDS, unless this
+        bucket has created or destroyed containers since.
+
         @return: A dictionary of all containers with detailed attributes,
                  indexed by container name.
         """
-        info_collection = get_container_info(self.container_path)
-        containers = {}
-        for info in info_collection:
-            container = Container(self.container_path, info)
-            containers[container.name] = container
-        return containers
+        if (self._containers is None or time.time() - self._containers_time >
+                CONTAINER_LIST_CACHE_SECONDS):
+            info_collection = get_container_info(self.container_path)
+            containers = {}
+            for info in info_collection:
+                container = Container(self.container_path, info)
+                containers[container.name] = container
+            self._containers = containers
+            self._containers_time = time.time()
+        return dict(self._containers)
 
 
     def get(self, name):
@@ -688,18 +835,46 @@ class ContainerBucket(object):
         @return: True if the container with the given name exists, otherwise
                  returns False.
         """
-        return self.get(name) != None
+        # A container always has a folder named after it in the container
+        # path. If that folder is missing, skip listing all containers. The
+        # check is only trusted if this process can search the container path.
+        if (os.access(self.container_path, os.X_OK) and
+                not os.path.lexists(os.path.join(self.container_path, name))):
+            return False
+        return name in self.get_all()
 
 
     def destroy_all(self):
         """Destroy all containers, base must be destroyed at the last.
+
+        Containers other than base are destroyed in parallel, as lxc-destroy
+        mostly waits on deleting the container's files. Base is only destroyed
+        once all of them are gone.
         """
-        containers = self.get_all().values()
-        for container in sorted(containers,
-                                key=lambda n: 1 if n.name == BASE else 0):
+        def _destroy(container):
+            """Destroy one container.
+
+            @param container: The Container to destroy.
+            """
             logging.info('Destroy container %s.', container.name)
             container.destroy()
 
+        containers = self.get_all()
+        base = containers.pop(BASE, None)
+        try:
+            if containers:
+                thread_pool = pool.ThreadPool(
+                        min(DESTROY_POOL_SIZE, len(containers)))
+                try:
+                    thread_pool.map(_destroy, containers.values())
+                finally:
+                    thread_pool.close()
+                    thread_pool.join()
+            if base:
+                _destroy(base)
+        finally:
+            self._invalidate()
+
 
     @timer.decorate
     def create_from_base(self, name, disable_snapshot_clone=False,
@@ -731,17 +906,22 @@ class ContainerBucket(object):
                 logging.warn('Failed to destroy container %s, error: %s',
                              name, e)
                 utils.run('sudo rm -rf "%s"' % container_folder)
+            self._invalidate()
 
         use_snapshot = SUPPORT_SNAPSHOT_CLONE and not disable_snapshot_clone
         snapshot = '-s' if  use_snapshot else ''
         # overlayfs is the default clone backend storage. However it is not
         # supported in Ganeti yet. Use aufs as the alternative.
-        aufs = '-B aufs' if utils.is_vm() and use_snapshot else ''
+        aufs = '-B aufs' if use_snapshot and _is_vm() else ''
         cmd = ('sudo lxc-clone -p %s -P %s %s' %
                (self.container_path, self.container_path,
                 ' '.join([BASE, name, snapshot, aufs])))
         try:
-            utils.run(cmd)
+            try:
+                utils.run(cmd)
+            finally:
+                # lxc-clone may leave a partial container behind on failure.
+                self._invalidate()
             return self.get(name)
         except error.CmdError:
             if not use_snapshot:
@@ -753,11 +933,10 @@ class ContainerBucket(object):
                 container = self.create_from_base(
                         name, disable_snapshot_clone=True, force_cleanup=True)
                 # Report metadata about retry success.
-                autotest_es.post(use_http=True,
-                                 type_str=CONTAINER_CREATE_RETRY_METADB_TYPE,
-                                 metadata={'drone': socket.gethostname(),
-                                           'name': name,
-                                           'success': True})
+                _post_metadata(CONTAINER_CREATE_RETRY_METADB_TYPE,
+                               {'drone': DRONE_HOSTNAME,
+                                'name': name,
+                                'success': True})
                 return container
 
 
@@ -779,7 +958,8 @@ class ContainerBucket(object):
             os.makedirs(self.container_path)
 
         base_path = os.path.join(self.container_path, name)
-        if self.exist(name) and not force_delete:
+        base_exists = self.exist(name)
+        if base_exists and not force_delete:
             logging.error(
                     'Base container already exists. Set force_delete to True '
                     'to force to re-stage base container. Note that this '
@@ -788,35 +968,30 @@ class ContainerBucket(object):
             # owner of not being root. Force to update the folder's owner.
             # TODO(dshi): Change root to current user when test container can be
             # unprivileged container.
-            utils.run('sudo chown -R root "%s"' % base_path)
-            utils.run('sudo chgrp -R root "%s"' % base_path)
+            utils.run('sudo chown -R root:root "%s"' % base_path)
             return
 
         # Destroy existing base container if exists.
-        if self.exist(name):
+        if base_exists:
             # TODO: We may need to destroy all snapshots created from this base
             # container, not all container.
             self.destroy_all()
 
         # Download and untar the base container.
-        tar_path = os.path.join(self.container_path, '%s.tar.xz' % name)
-        path_to_cleanup = [tar_path, base_path]
-        for path in path_to_cleanup:
-            if os.path.exists(path):
-                utils.run('sudo rm -rf "%s"' % path)
-        download_extract(CONTAINER_BASE_URL, tar_path, self.container_path)
-        # Remove the downloaded container tar file.
-        utils.run('sudo rm "%s"' % tar_path)
-        # Set proper file permission.
+        # The base container changes on disk from here on.
+        self._invalidate()
+        if os.path.exists(base_path):
+            utils.run('sudo rm -rf "%s"' % base_path)
+        download_extract(CONTAINER_BASE_URL, self.container_path)
+        # Set proper file permission, and update container config with
+        # container_path from global config, under a single sudo.
         # TODO(dshi): Change root to current user when test container can be
         # unprivileged container.
-        utils.run('sudo chown -R root "%s"' % base_path)
-        utils.run('sudo chgrp -R root "%s"' % base_path)
-
-        # Update container config with container_path from global config.
         config_path = os.path.join(base_path, 'config')
-        utils.run('sudo sed -i "s|container_dir|%s|g" "%s"' %
-                  (self.container_path, config_path))
+        cmd = ('chown -R root:root "%s" && '
+               'sed -i "s|container_dir|%s|g" "%s"' %
+               (base_path, self.container_path, config_path))
+        utils.run('sudo bash -c "%s"' % utils.sh_escape(cmd))
 
 
     @timer.decorate
@@ -855,28 +1030,60 @@ class ContainerBucket(object):
                                        result_path)
         result_path = os.path.abspath(result_path)
 
-        # Create test container from the base container.
-        container = self.create_from_base(name)
-
-        # Deploy server side package
-        usr_local_path = os.path.join(container.rootfs, 'usr', 'local')
-        autotest_pkg_path = os.path.join(usr_local_path,
-                                         'autotest_server_package.tar.bz2')
-        autotest_path = os.path.join(usr_local_path, 'autotest')
-        # sudo is required so os.makedirs may not work.
-        utils.run('sudo mkdir -p %s'% usr_local_path)
-
-        download_extract(server_package_url, autotest_pkg_path, usr_local_path)
+        # Download the server side package while the test container is cloned
+        # from the base container; the package is extracted into the
+        # container's rootfs once both are done.
+        autotest_pkg_path = os.path.join(
+                self.container_path,
+                '%s_autotest_server_package.tar.bz2' % name)
+        download_exc_info = []
+        def _download_package():
+            """Download the server side package, recording any failure."""
+            try:
+                download(server_package_url, autotest_pkg_path)
+            except:
+                download_exc_info.append(sys.exc_info())
+        download_thread = threading.Thread(target=_download_package)
+        download_thread.start()
+        try:
+            try:
+                container = self.create_from_base(name)
+
+                usr_local_path = os.path.join(container.rootfs, 'usr', 'local')
+                autotest_path = os.path.join(usr_local_path, 'autotest')
+                # sudo is required so os.makedirs may not work.
+                utils.run('sudo mkdir -p %s'% usr_local_path)
+            finally:
+                download_thread.join()
+
+            # Deploy server side package
+            if download_exc_info:
+                exc_info = download_exc_info[0]
+                raise exc_info[0], exc_info[1], exc_info[2]
+            try:
+                _extract(autotest_pkg_path, usr_local_path)
+            except error.CmdError as e:
+                logging.warn('Failed to extract server side package, '
+                             'downloading it again: %s', e)
+                download_extract(server_package_url, usr_local_path)
+        finally:
+            try:
+                _remove_file(autotest_pkg_path)
+            except error.CmdError as e:
+                logging.warn('Failed to remove %s: %s', autotest_pkg_path, e)
         deploy_config_manager = lxc_config.DeployConfigManager(container)
         deploy_config_manager.deploy_pre_start()
 
         # Copy over control file to run the test job.
         if control:
+            # The container rootfs is owned by root, so this still needs sudo,
+            # but one sudo call is enough for both steps.
             container_drone_temp = os.path.join(autotest_path, 'drone_tmp')
-            utils.run('sudo mkdir -p %s'% container_drone_temp)
             container_control_file = os.path.join(
                     container_drone_temp, os.path.basename(control))
-            utils.run('sudo cp %s %s' % (control, container_control_file))
+            cmd = ('mkdir -p %s && cp %s %s' %
+                   (container_drone_temp, control, container_control_file))
+            utils.run('sudo bash -c "%s"' % utils.sh_escape(cmd))
 
         if IS_MOBLAB:
             site_packages_path = MOBLAB_SITE_PACKAGES
@@ -897,14 +1104,12 @@ class ContainerBucket(object):
                           False),
                         ]
         # Update container config to mount directories.
-        for source, destination, readonly in mount_entries:
-            container.mount_dir(source, destination, readonly)
+        container.mount_dirs(mount_entries)
 
         # Update file permissions.
         # TODO(dshi): crbug.com/459344 Skip following action when test container
         # can be unprivileged container.
-        utils.run('sudo chown -R root "%s"' % autotest_path)
-        utils.run('sudo chgrp -R root "%s"' % autotest_path)
+        utils.run('sudo chown -R root:root "%s"' % autotest_path)
 
         container.start(name)
         deploy_config_manager.deploy_post_start()
@@ -913,12 +1118,11 @@ class ContainerBucket(object):
 
         container.verify_autotest_setup(job_id)
 
-        autotest_es.post(use_http=True,
-                         type_str=CONTAINER_CREATE_METADB_TYPE,
-                         metadata={'drone': socket.gethostname(),
-                                   'job_id': job_id,
-                                   'time_used': time.time() - start_time,
-                                   'success': True})
+        _post_metadata(CONTAINER_CREATE_METADB_TYPE,
+                       {'drone': DRONE_HOSTNAME,
+                        'job_id': job_id,
+                        'time_used': time.time() - start_time,
+                        'success': True})
 
         logging.debug('Test container %s is set up.', name)
         return container
@@ -228,41 +228,38 @@ class DeployConfigManager(object):
         shadow_config = os.path.join(CONTAINER_AUTOTEST_DIR,
                                      'shadow_config.ini')
 
-        # Inject "AUTOSERV/enable_master_ssh: False" in shadow config as
-        # container does not support master ssh connection yet.
-        self.container.attach_run(
-                'echo $\'\n[AUTOSERV]\nenable_master_ssh: False\n\' >> %s' %
-                shadow_config)
-
         host_ip = lxc_utils.get_host_ip()
         local_names = ['localhost', '127.0.0.1']
 
         db_host = config.get_config_value('AUTOTEST_WEB', 'host')
         if db_host.lower() in local_names:
-            new_host = host_ip
+            new_db_host = host_ip
         else:
-            new_host = socket.getfqdn(db_host)
-        self.container.attach_run('echo $\'\n[AUTOTEST_WEB]\nhost: %s\n\' >> %s'
-                                  % (new_host, shadow_config))
+            new_db_host = socket.getfqdn(db_host)
 
         afe_host = config.get_config_value('SERVER', 'hostname')
         if afe_host.lower() in local_names:
-            new_host = host_ip
+            new_afe_host = host_ip
         else:
-            new_host = socket.getfqdn(afe_host)
-        self.container.attach_run('echo $\'\n[SERVER]\nhostname: %s\n\' >> %s' %
-                                  (new_host, shadow_config))
-
-        # Update configurations in SSP section:
-        # user: The user running current process.
-        # is_moblab: True if the autotest server is a Moblab instance.
-        # host_container_ip: IP address of the lxcbr0 interface. Process running
-        #     inside container can make RPC through this IP.
-        self.container.attach_run(
-                'echo $\'\n[SSP]\nuser: %s\nis_moblab: %s\n'
-                'host_container_ip: %s\n\' >> %s' %
-                (getpass.getuser(), bool(utils.is_moblab()),
-                 lxc_utils.get_host_ip(), shadow_config))
+            new_afe_host = socket.getfqdn(afe_host)
+
+        # All sections are appended with a single lxc-attach:
+        # 1. Inject "AUTOSERV/enable_master_ssh: False" as container does not
+        #    support master ssh connection yet.
+        # 2. Point AUTOTEST_WEB/host and SERVER/hostname at the updated hosts.
+        # 3. Update configurations in SSP section:
+        #    user: The user running current process.
+        #    is_moblab: True if the autotest server is a Moblab instance.
+        #    host_container_ip: IP address of the lxcbr0 interface. Process
+        #        running inside container can make RPC through this IP.
+        content = ('\n[AUTOSERV]\nenable_master_ssh: False\n\n'
+                   '\n[AUTOTEST_WEB]\nhost: %s\n\n'
+                   '\n[SERVER]\nhostname: %s\n\n'
+                   '\n[SSP]\nuser: %s\nis_moblab: %s\nhost_container_ip: %s\n' %
+                   (new_db_host, new_afe_host, getpass.getuser(),
+                    bool(utils.is_moblab()), host_ip))
+        self.container.attach_run('echo $\'%s\' >> %s' %
+                                  (content, shadow_config))
 
 
     def _modify_ssh_config(self):
@@ -274,33 +271,29 @@ class DeployConfigManager(object):
         to work inside container.
 
         """
-        # Remove domain specific flags.
         ssh_config = '/root/.ssh/config'
-        self.container.attach_run('sed -i \'s/UseProxyIf=false//g\' \'%s\'' %
-                                  ssh_config)
+        # The first sed expression removes domain specific flags.
         # TODO(dshi): crbug.com/451622 ssh connection loglevel is set to
         # ERROR in container before master ssh connection works. This is
         # to avoid logs being flooded with warning `Permanently added
         # '[hostname]' (RSA) to the list of known hosts.` (crbug.com/478364)
-        # The sed command injects following at the beginning of .ssh/config
-        # used in config. With such change, ssh command will not post
-        # warnings.
+        # The second sed expression injects following at the beginning of
+        # .ssh/config used in config. With such change, ssh command will not
+        # post warnings.
         # Host *
         #   LogLevel Error
         self.container.attach_run(
-                'sed -i \'1s/^/Host *\\n  LogLevel ERROR\\n\\n/\' \'%s\'' %
+                'sed -i -e \'s/UseProxyIf=false//g\' '
+                '-e \'1s/^/Host *\\n  LogLevel ERROR\\n\\n/\' \'%s\'' %
                 ssh_config)
 
-        # Inject ssh config for moblab to ssh to dut from container.
+        # Inject ssh config for moblab to ssh to dut from container:
+        # ssh to moblab itself using moblab user, and to duts using root user.
         if utils.is_moblab():
-            # ssh to moblab itself using moblab user.
             self.container.attach_run(
                     'echo $\'\nHost 192.168.231.1\n  User moblab\n  '
-                    'IdentityFile %%d/.ssh/testing_rsa\' >> %s' %
-                    '/root/.ssh/config')
-            # ssh to duts using root user.
-            self.container.attach_run(
-                    'echo $\'\nHost *\n  User root\n  '
+                    'IdentityFile %%d/.ssh/testing_rsa\n'
+                    '\nHost *\n  User root\n  '
                     'IdentityFile %%d/.ssh/testing_rsa\' >> %s' %
                     '/root/.ssh/config')
 